@@ -0,0 +1,90 @@
+"""Compare ingest time for the same dataset across upload formats.
+
+Usage: python benchmarks/bench_ingest.py --rows 1000000 --repeat 3
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest import parse_bytes  # noqa: E402
+
+
+def make_dataset(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "id": np.arange(n_rows),
+            "amount": rng.normal(100, 25, n_rows).round(2),
+            "quantity": rng.integers(0, 1000, n_rows),
+            "ratio": rng.random(n_rows),
+            "region": rng.choice(["north", "south", "east", "west"], n_rows),
+            "date": pd.date_range("2020-01-01", periods=n_rows, freq="min").astype(str),
+        }
+    )
+
+
+def encode(df: pd.DataFrame) -> dict:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    payloads = {"csv": df.to_csv(index=False).encode("utf-8")}
+
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False)
+    payloads["parquet"] = buf.getvalue()
+
+    buf = io.BytesIO()
+    feather.write_feather(df, buf, compression="uncompressed")
+    payloads["feather"] = buf.getvalue()
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    payloads["arrow_stream"] = sink.getvalue().to_pybytes()
+    return payloads
+
+
+def time_it(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payloads = encode(make_dataset(args.rows))
+    cases = [
+        ("csv (C engine)", "csv", {"format": "csv"}),
+        ("csv (pyarrow engine)", "csv", {"format": "csv", "csv_engine": "pyarrow"}),
+        ("parquet", "parquet", {"format": "parquet"}),
+        ("parquet, 2 columns", "parquet", {"format": "parquet", "columns": ("id", "amount")}),
+        ("feather", "feather", {"format": "feather"}),
+        ("arrow stream", "arrow_stream", {"format": "arrow_stream"}),
+    ]
+
+    print(f"{args.rows:,} rows, best of {args.repeat}")
+    print(f"{'case':<24}{'size (MB)':>12}{'seconds':>10}{'MB/s':>10}")
+    for label, payload_name, options in cases:
+        data = payloads[payload_name]
+        seconds = time_it(lambda: parse_bytes(data, **options), args.repeat)
+        size_mb = len(data) / 1024 ** 2
+        print(f"{label:<24}{size_mb:>12.1f}{seconds:>10.3f}{size_mb / seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe LRU mapping bounded by entry count and, optionally, total size."""
+
+    def __init__(
+        self,
+        max_entries: int = 8,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda _value: 0)
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._lock = threading.RLock()
+        self._building: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value and mark it most recently used."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value without touching recency or the hit/miss counters."""
+        with self._lock:
+            return self._data.get(key, default)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert a value, evicting least recently used entries past the bounds."""
+        size = int(self._sizeof(value))
+        with self._lock:
+            if key in self._data:
+                self._data.pop(key)
+                self._sizes.pop(key, None)
+            self._data[key] = value
+            self._sizes[key] = size
+            self._evict()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the cached value, building and storing it on a miss.
+
+        Concurrent misses on the same key wait for a single build instead of repeating it.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        with self._lock:
+            build_lock = self._building.setdefault(key, threading.Lock())
+        try:
+            with build_lock:
+                with self._lock:
+                    if key in self._data:
+                        self._data.move_to_end(key)
+                        return self._data[key]
+                value = factory()
+                self.put(key, value)
+                return value
+        finally:
+            with self._lock:
+                if self._building.get(key) is build_lock and not build_lock.locked():
+                    self._building.pop(key, None)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            self._sizes.pop(key, None)
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for display: hits, misses, evictions, entries and bytes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._data),
+                "bytes": sum(self._sizes.values()),
+            }
+
+    def _evict(self) -> None:
+        # Never evict the entry that was just inserted, even if it alone exceeds the byte bound.
+        while len(self._data) > 1 and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and sum(self._sizes.values()) > self.max_bytes)
+        ):
+            old_key, _ = self._data.popitem(last=False)
+            self._sizes.pop(old_key, None)
+            self.evictions += 1
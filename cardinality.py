@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import dataset_store
+
+# Columns up to this many rows are counted exactly; beyond it, HyperLogLog over chunks.
+EXACT_MAX_ROWS = 1_000_000
+CHUNK_ROWS = 200_000
+HLL_PRECISION = 14
+# Above this many distinct values a text column is flagged as high cardinality.
+HIGH_CARDINALITY = 50
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch over 64-bit hashes (2 ** precision one-byte registers)."""
+
+    def __init__(self, precision: int = HLL_PRECISION) -> None:
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype="uint8")
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of ``estimate()`` relative to the true count."""
+        return 1.04 / np.sqrt(self.m)
+
+    def update(self, hashes: np.ndarray) -> None:
+        hashes = np.asarray(hashes, dtype="uint64")
+        if hashes.size == 0:
+            return
+        tail_bits = 64 - self.precision
+        index = (hashes >> np.uint64(tail_bits)).astype("int64")
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+        # Rank = position of the first 1-bit in the tail; frexp's exponent is the bit length.
+        bit_length = np.frexp(tail.astype("float64"))[1]
+        rank = (tail_bits - bit_length + 1).astype("uint8")
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype("int64")))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction: linear counting on the empty registers.
+            return m * np.log(m / zeros)
+        return float(raw)
+
+
+@dataclass(frozen=True)
+class DistinctCount:
+    value: int
+    # Relative error at ~95% confidence; 0 for exact counts.
+    error: float = 0.0
+    # False when the scan stopped early because the count was clearly above the threshold.
+    complete: bool = True
+
+    @property
+    def exact(self) -> bool:
+        return self.error == 0.0
+
+    def label(self) -> str:
+        if self.exact:
+            return f"{self.value:,}"
+        if not self.complete:
+            return f"≥ ≈{self.value:,} (stopped early)"
+        return f"≈{self.value:,} ± {self.error * 100:.1f}%"
+
+
+def distinct_count(
+    series: pd.Series,
+    stop_above: Optional[int] = None,
+    exact_max_rows: int = EXACT_MAX_ROWS,
+) -> DistinctCount:
+    """Number of distinct non-missing values, exact for small columns and HyperLogLog for large ones.
+
+    With ``stop_above``, the scan ends as soon as the count is clearly (3 standard errors)
+    above it; the result is then a lower estimate with ``complete=False``.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        used = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+        return DistinctCount(int(np.count_nonzero(used)))
+    if len(series) <= exact_max_rows:
+        return DistinctCount(int(series.nunique(dropna=True)))
+
+    sketch = HyperLogLog()
+    # Low-cardinality columns saturate registers early but still need the full scan for a sure count.
+    for start in range(0, len(series), CHUNK_ROWS):
+        chunk = series.iloc[start:start + CHUNK_ROWS].dropna()
+        sketch.update(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+        if stop_above is not None and start + CHUNK_ROWS < len(series):
+            estimate = sketch.estimate()
+            if estimate * (1 - 3 * sketch.relative_error) > stop_above:
+                return DistinctCount(int(estimate), 2 * sketch.relative_error, complete=False)
+    return DistinctCount(int(round(sketch.estimate())), 2 * sketch.relative_error)
+
+
+def get_distinct_counts(
+    dataset_key: str, data: pd.DataFrame, columns: Sequence[Any], stop_above: Optional[int] = None
+) -> Dict[Any, DistinctCount]:
+    """Distinct counts for a dataset version, cached per column while the dataset is held.
+
+    A complete count already computed for a column is reused for any threshold.
+    """
+    counts = {}
+    for name in columns:
+        full = dataset_store.registry.peek_artifact(dataset_key, ("distinct", name, None))
+        if full is not None:
+            counts[name] = full
+            continue
+        counts[name] = dataset_store.artifact(
+            dataset_key, ("distinct", name, stop_above), lambda: distinct_count(data[name], stop_above)
+        )
+    return counts
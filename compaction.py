@@ -0,0 +1,79 @@
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    ARROW_STRING = "string[pyarrow]"
+except Exception:
+    ARROW_STRING = None
+
+# Object columns with at most this share of distinct values become `category`.
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _compact_integer(series: pd.Series) -> pd.Series:
+    if series.empty:
+        return series
+    kind = "unsigned" if series.min() >= 0 else "integer"
+    return pd.to_numeric(series, downcast=kind)
+
+
+def _compact_float(series: pd.Series) -> pd.Series:
+    # Only downcast when every value survives the float32 round trip.
+    values = series.to_numpy()
+    narrowed = values.astype(np.float32)
+    if np.array_equal(narrowed.astype(values.dtype), values, equal_nan=True):
+        return pd.Series(narrowed, index=series.index, name=series.name)
+    return series
+
+
+def _compact_text(series: pd.Series, category_max_ratio: float) -> pd.Series:
+    if pd.api.types.infer_dtype(series, skipna=True) not in ("string", "empty"):
+        return series
+    non_null = series.count()
+    if non_null and series.nunique(dropna=True) <= category_max_ratio * non_null:
+        return series.astype("category")
+    if ARROW_STRING is not None:
+        return series.astype(ARROW_STRING)
+    return series
+
+
+def compact_series(series: pd.Series, category_max_ratio: float = CATEGORY_MAX_RATIO) -> pd.Series:
+    """Return the column in the smallest dtype that keeps every value intact."""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+        return _compact_integer(series)
+    if pd.api.types.is_float_dtype(dtype) and isinstance(dtype, np.dtype):
+        return _compact_float(series)
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        return _compact_text(series, category_max_ratio)
+    return series
+
+
+def compact_dtypes(
+    df: pd.DataFrame, category_max_ratio: float = CATEGORY_MAX_RATIO
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Downcast numerics and shrink text columns; return the new frame and a per-column memory report."""
+    before = df.memory_usage(deep=True, index=False)
+    columns = [compact_series(df.iloc[:, i], category_max_ratio) for i in range(df.shape[1])]
+    compacted = pd.concat(columns, axis=1) if columns else df.copy()
+    compacted.columns = df.columns
+    after = compacted.memory_usage(deep=True, index=False)
+
+    report = pd.DataFrame(
+        {
+            "Column": df.columns,
+            "Type before": df.dtypes.astype(str).values,
+            "Type after": compacted.dtypes.astype(str).values,
+            "Before (KB)": before.values / 1024,
+            "After (KB)": after.values / 1024,
+        }
+    )
+    report["Saved %"] = np.where(
+        report["Before (KB)"] > 0, (1 - report["After (KB)"] / report["Before (KB)"]) * 100, 0.0
+    )
+    return compacted, report
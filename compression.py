@@ -0,0 +1,149 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Tuple
+
+COPY_BLOCK_BYTES = 1024 * 1024
+
+
+@dataclass
+class DecompressionStats:
+    codec: str
+    compressed_bytes: int
+    uncompressed_bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        return self.uncompressed_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.uncompressed_bytes / 1024 ** 2 / self.seconds if self.seconds > 0 else 0.0
+
+
+class CountingReader(io.RawIOBase):
+    """Read-only stream that records how many bytes were decompressed and how long it took."""
+
+    def __init__(self, stream: BinaryIO, stats: DecompressionStats, source: io.BytesIO) -> None:
+        self._stream = stream
+        self._source = source
+        self.stats = stats
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        start = time.perf_counter()
+        data = self._stream.read(len(buffer))
+        self.stats.seconds += time.perf_counter() - start
+        n = len(data)
+        buffer[:n] = data
+        self.stats.uncompressed_bytes += n
+        return n
+
+    @property
+    def compressed_position(self) -> int:
+        """How far into the compressed payload the decompressor has read."""
+        return self._source.tell()
+
+    def close(self) -> None:
+        self._stream.close()
+        super().close()
+
+
+def _is_workbook(data: bytes) -> bool:
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            return any(name.startswith("xl/") for name in archive.namelist())
+    except zipfile.BadZipFile:
+        return False
+
+
+def detect_compression(data: bytes) -> Optional[str]:
+    """Codec of a compressed upload from its magic bytes, or None for plain payloads."""
+    head = bytes(data[:6])
+    if head.startswith(b"\x1f\x8b"):
+        return "gzip"
+    if head.startswith(b"BZh"):
+        return "bz2"
+    if head.startswith(b"\x28\xb5\x2f\xfd"):
+        return "zstd"
+    if head.startswith(b"\xfd7zXZ\x00"):
+        return "xz"
+    # An .xlsx is a zip too, but it is read as a workbook, not unpacked.
+    if head.startswith(b"PK\x03\x04") and not _is_workbook(data):
+        return "zip"
+    return None
+
+
+def _zip_member(archive: zipfile.ZipFile) -> str:
+    members = [info for info in archive.infolist() if not info.is_dir() and not info.filename.startswith("__MACOSX/")]
+    if not members:
+        raise ValueError("The zip archive is empty.")
+    # Archives usually hold one data file; otherwise take the largest.
+    return max(members, key=lambda info: info.file_size).filename
+
+
+def _decompressor(source: io.BytesIO, codec: str) -> Tuple[BinaryIO, Optional[str]]:
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=source, mode="rb"), None
+    if codec == "bz2":
+        return bz2.BZ2File(source, mode="rb"), None
+    if codec == "xz":
+        return lzma.LZMAFile(source, mode="rb"), None
+    if codec == "zstd":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise ValueError("Reading .zst uploads requires the 'zstandard' package.") from exc
+        return zstandard.ZstdDecompressor().stream_reader(source), None
+    if codec == "zip":
+        archive = zipfile.ZipFile(source)
+        member = _zip_member(archive)
+        return archive.open(member), member
+    raise ValueError(f"Unsupported compression: {codec}")
+
+
+def open_stream(data: bytes, codec: str) -> CountingReader:
+    """Stream the decompressed payload; only one decompressor buffer is held at a time."""
+    source = io.BytesIO(data)
+    stream, _ = _decompressor(source, codec)
+    return CountingReader(stream, DecompressionStats(codec, len(data)), source)
+
+
+def member_name(data: bytes, codec: str) -> Optional[str]:
+    """File name inside a zip archive, used as a hint when sniffing."""
+    if codec != "zip":
+        return None
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return _zip_member(archive)
+
+
+def peek(data: bytes, codec: str, n: int) -> bytes:
+    """First ``n`` decompressed bytes."""
+    with open_stream(data, codec) as stream:
+        return stream.read(n)
+
+
+def spill_to_tempfile(data: bytes, codec: str) -> Tuple[str, DecompressionStats]:
+    """Decompress to a temporary file, for readers that need random access (Parquet, Excel).
+
+    The caller removes the file once it has been read.
+    """
+    fd, path = tempfile.mkstemp(prefix="dvx-", suffix=".bin")
+    try:
+        with os.fdopen(fd, "wb") as sink, open_stream(data, codec) as stream:
+            shutil.copyfileobj(stream, sink, COPY_BLOCK_BYTES)
+            stats = stream.stats
+    except Exception:
+        os.remove(path)
+        raise
+    return path, stats
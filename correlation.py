@@ -0,0 +1,192 @@
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import dataset_store
+
+# How missing values are treated: pairwise-complete rows (as DataFrame.corr), rows complete
+# in every column, or mean imputation (fastest, slightly shrinks correlations).
+MISSING_MODES = ("pairwise", "complete", "mean")
+BLOCK_COLS = 256
+# Up to this many columns the full matrix is small enough to keep and share (500 x 500 float32 = 1 MB).
+MATRIX_MAX_COLS = 500
+PAIR_COLUMNS = ["col1", "col2", "corr"]
+
+
+def _complete_rows(data: pd.DataFrame, columns: List[Any]) -> np.ndarray:
+    valid = np.ones(len(data), dtype=bool)
+    for start in range(0, len(columns), BLOCK_COLS):
+        valid &= data[columns[start:start + BLOCK_COLS]].notna().all(axis=1).to_numpy()
+    return valid
+
+
+def _prepare(
+    data: pd.DataFrame, columns: List[Any], missing: str, rows: Optional[np.ndarray]
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """float32 block ready for a matrix product, plus the not-missing mask in pairwise mode."""
+    values = data[columns].to_numpy(dtype="float32", na_value=np.nan, copy=True)
+    if rows is not None:
+        values = values[rows]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nanmean(values, axis=0) if len(values) else np.zeros(values.shape[1], dtype="float32")
+        # Centring first keeps the float32 sums below from cancelling.
+        values -= mean
+        mask = ~np.isnan(values)
+        values[~mask] = 0
+        if missing == "pairwise":
+            return values, mask.astype("float32")
+        std = np.sqrt((values * values).sum(axis=0) / max(len(values) - 1, 1))
+        values /= std * np.sqrt(max(len(values) - 1, 1))
+    return values, None
+
+
+def _block_corr(
+    a: Tuple[np.ndarray, Optional[np.ndarray]], b: Tuple[np.ndarray, Optional[np.ndarray]]
+) -> np.ndarray:
+    (za, ma), (zb, mb) = a, b
+    if ma is None:
+        return za.T @ zb
+    n = ma.T @ mb
+    sx = za.T @ mb
+    sy = ma.T @ zb
+    sxx = (za * za).T @ mb
+    syy = ma.T @ (zb * zb)
+    sxy = za.T @ zb
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+        corr = cov / np.sqrt(var)
+    corr[(n < 2) | ~(var > 0)] = np.nan
+    return corr
+
+
+def iter_blocks(
+    data: pd.DataFrame,
+    columns: Sequence[Any],
+    missing: str = "pairwise",
+    block_cols: int = BLOCK_COLS,
+    rows: Optional[np.ndarray] = None,
+) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """Yield ``(row_offset, col_offset, block)`` for the upper triangle of the correlation matrix.
+
+    Only two column blocks are held at a time, so memory grows with ``block_cols``, not with
+    the number of columns. ``rows`` is an optional boolean mask restricting the rows used.
+    """
+    if missing not in MISSING_MODES:
+        raise ValueError(f"missing must be one of {MISSING_MODES}, not {missing!r}")
+    columns = list(columns)
+    if missing == "complete":
+        complete = _complete_rows(data, columns)
+        rows = complete if rows is None else rows & complete
+    for i in range(0, len(columns), block_cols):
+        left = _prepare(data, columns[i:i + block_cols], missing, rows)
+        for j in range(i, len(columns), block_cols):
+            right = left if j == i else _prepare(data, columns[j:j + block_cols], missing, rows)
+            yield i, j, _block_corr(left, right)
+
+
+def correlation_matrix(
+    data: pd.DataFrame, columns: Sequence[Any], missing: str = "pairwise", rows: Optional[np.ndarray] = None
+) -> pd.DataFrame:
+    """Full correlation matrix, assembled from float32 blocks, optionally over the ``rows`` mask only."""
+    columns = list(columns)
+    out = np.empty((len(columns), len(columns)), dtype="float32")
+    for i, j, block in iter_blocks(data, columns, missing, rows=rows):
+        out[i:i + block.shape[0], j:j + block.shape[1]] = block
+        out[j:j + block.shape[1], i:i + block.shape[0]] = block.T
+    return pd.DataFrame(out, index=columns, columns=columns)
+
+
+def _pairs_frame(columns: List[Any], rows: np.ndarray, cols: np.ndarray, values: np.ndarray) -> pd.DataFrame:
+    order = np.argsort(-np.abs(values), kind="stable")
+    names = np.asarray(columns, dtype=object)
+    return pd.DataFrame(
+        {"col1": names[rows[order]], "col2": names[cols[order]], "corr": values[order].astype("float64")},
+        columns=PAIR_COLUMNS,
+    )
+
+
+def _select(
+    block: np.ndarray, i: int, j: int, threshold: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    strength = np.abs(block)
+    if i == j:
+        # Diagonal block: keep the strict upper triangle only.
+        strength = np.triu(strength, k=1)
+    r, c = np.nonzero(strength > threshold)
+    return r + i, c + j, block[r, c]
+
+
+def _keep_top(found: List[np.ndarray], top_k: int) -> List[np.ndarray]:
+    rows, cols, values = found
+    if len(values) > top_k:
+        keep = np.argpartition(-np.abs(values), top_k - 1)[:top_k]
+        rows, cols, values = rows[keep], cols[keep], values[keep]
+    return [rows, cols, values]
+
+
+def correlated_pairs(
+    data: pd.DataFrame,
+    columns: Sequence[Any],
+    threshold: float = 0.8,
+    top_k: Optional[int] = None,
+    missing: str = "pairwise",
+) -> pd.DataFrame:
+    """Column pairs with ``|corr| > threshold`` (at most ``top_k`` strongest), strongest first.
+
+    Blocks are scanned one at a time and only qualifying pairs are kept, never the full matrix.
+    """
+    columns = list(columns)
+    found = [np.empty(0, dtype="int64"), np.empty(0, dtype="int64"), np.empty(0, dtype="float32")]
+    cutoff = threshold
+    for i, j, block in iter_blocks(data, columns, missing):
+        rows, cols, values = _select(block, i, j, cutoff)
+        found = [np.concatenate([a, b]) for a, b in zip(found, (rows, cols, values))]
+        if top_k is not None and len(found[2]) >= 2 * top_k:
+            found = _keep_top(found, top_k)
+            # Later blocks only need pairs that beat the current k-th strongest.
+            cutoff = max(threshold, float(np.abs(found[2]).min()))
+    if top_k is not None:
+        found = _keep_top(found, top_k)
+    return _pairs_frame(columns, *found)
+
+
+def pairs_from_matrix(matrix: pd.DataFrame, threshold: float = 0.8, top_k: Optional[int] = None) -> pd.DataFrame:
+    found = list(_select(matrix.to_numpy(), 0, 0, threshold))
+    if top_k is not None:
+        found = _keep_top(found, top_k)
+    return _pairs_frame(list(matrix.columns), *found)
+
+
+def get_correlation_matrix(
+    dataset_key: str, data: pd.DataFrame, columns: Sequence[Any], missing: str = "pairwise"
+) -> pd.DataFrame:
+    """Correlation matrix for a dataset version, shared by the heatmap and the insights."""
+    name = ("corr_matrix", tuple(columns), missing)
+    return dataset_store.artifact(dataset_key, name, lambda: correlation_matrix(data, columns, missing))
+
+
+def get_correlated_pairs(
+    dataset_key: str,
+    data: pd.DataFrame,
+    columns: Sequence[Any],
+    threshold: float = 0.8,
+    top_k: Optional[int] = None,
+    missing: str = "pairwise",
+) -> pd.DataFrame:
+    """Strongly correlated pairs for a dataset version.
+
+    Narrow datasets read them off the shared matrix (building it if needed); wide ones stream
+    blocks and cache only the pairs.
+    """
+    columns = list(columns)
+    matrix = dataset_store.registry.peek_artifact(dataset_key, ("corr_matrix", tuple(columns), missing))
+    if matrix is None and len(columns) <= MATRIX_MAX_COLS:
+        matrix = get_correlation_matrix(dataset_key, data, columns, missing)
+    if matrix is not None:
+        return pairs_from_matrix(matrix, threshold, top_k)
+    name = ("corr_pairs", tuple(columns), threshold, top_k, missing)
+    return dataset_store.artifact(
+        dataset_key, name, lambda: correlated_pairs(data, columns, threshold, top_k, missing)
+    )
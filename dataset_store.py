@@ -0,0 +1,306 @@
+import itertools
+import os
+import tempfile
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+
+STORE_DIR = os.environ.get("DVX_STORE_DIR", os.path.join(tempfile.gettempdir(), "datavisionx-store"))
+# Frames kept open across all sessions; beyond this, least recently used ones are dropped and re-mapped on demand.
+MAX_OPEN_FRAMES = 8
+# Memory budget for one dataset's derived artifacts (indexes, matrices, parsed dates, ...).
+MAX_ARTIFACT_BYTES = int(os.environ.get("DVX_ARTIFACT_MAX_BYTES", 1024 ** 3))
+# Disk budget for spilled datasets. Beyond it, the least recently used files that no session holds are deleted.
+MAX_STORE_BYTES = int(os.environ.get("DVX_STORE_MAX_BYTES", 20 * 1024 ** 3))
+
+
+@dataclass(frozen=True)
+class DatasetHandle:
+    """Lightweight reference to a dataset spilled to disk; this is what sessions hold."""
+
+    key: str
+    path: str
+    n_rows: int
+    columns: Tuple[str, ...]
+    nbytes: int
+
+
+_open_frames = LRUCache(max_entries=MAX_OPEN_FRAMES)
+_handles = LRUCache(max_entries=256)
+_write_lock = threading.Lock()
+
+
+def _path_for(key: str) -> str:
+    safe = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in key)
+    return os.path.join(STORE_DIR, f"{safe}.arrow")
+
+
+def _to_table(df: pd.DataFrame):
+    import pyarrow as pa
+
+    try:
+        return pa.Table.from_pandas(df)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Object columns mixing Python types have no Arrow equivalent; store them as text.
+        fixed = df.copy(deep=False)
+        for col in fixed.columns:
+            if pd.api.types.is_object_dtype(fixed[col].dtype):
+                try:
+                    pa.array(fixed[col], from_pandas=True)
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    fixed[col] = fixed[col].map(lambda v: v if pd.isna(v) else str(v))
+        return pa.Table.from_pandas(fixed)
+
+
+def _write(path: str, df: pd.DataFrame) -> None:
+    import pyarrow as pa
+
+    os.makedirs(STORE_DIR, exist_ok=True)
+    table = _to_table(df)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    # Uncompressed Arrow IPC so the file can be memory-mapped without decoding.
+    with pa.OSFile(tmp, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def get_handle(key: str) -> Optional[DatasetHandle]:
+    """Handle for a dataset already in the store, if any."""
+    handle = _handles.get(key)
+    if handle is not None and os.path.exists(handle.path):
+        return handle
+    return None
+
+
+def put(key: str, df: pd.DataFrame) -> DatasetHandle:
+    """Spill a frame to the store (once per key) and return its handle."""
+    handle = get_handle(key)
+    if handle is not None:
+        return handle
+    path = _path_for(key)
+    with _write_lock:
+        if not os.path.exists(path):
+            _write(path, df)
+    handle = DatasetHandle(
+        key=key,
+        path=path,
+        n_rows=len(df),
+        columns=tuple(str(col) for col in df.columns),
+        nbytes=os.path.getsize(path),
+    )
+    _handles.put(key, handle)
+    prune(keep=path)
+    return handle
+
+
+def prune(max_bytes: Optional[int] = None, keep: Optional[str] = None) -> int:
+    """Delete least recently used store files until the store fits ``max_bytes``; returns bytes freed.
+
+    Files of datasets held in the registry (or ``keep``) are never deleted. Caches that still
+    point at a deleted file notice through ``get_handle`` and rebuild it.
+    """
+    limit = MAX_STORE_BYTES if max_bytes is None else max_bytes
+    try:
+        names = [name for name in os.listdir(STORE_DIR) if name.endswith(".arrow")]
+    except FileNotFoundError:
+        return 0
+    files = []
+    for name in names:
+        path = os.path.join(STORE_DIR, name)
+        try:
+            info = os.stat(path)
+        except FileNotFoundError:
+            continue
+        files.append((info.st_mtime, info.st_size, path))
+    total = sum(size for _, size, _ in files)
+    if total <= limit:
+        return 0
+    held = registry.held_paths()
+    if keep is not None:
+        held.add(keep)
+    freed = 0
+    for _, size, path in sorted(files):
+        if total - freed <= limit:
+            break
+        if path in held:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            # Still mapped on a platform that forbids deleting open files; try again next time.
+            continue
+        freed += size
+    return freed
+
+
+def get_or_put(key: str, build: Callable[[], pd.DataFrame]) -> DatasetHandle:
+    """Handle for ``key``, building and spilling the frame only if the store does not have it."""
+    handle = get_handle(key)
+    return handle if handle is not None else put(key, build())
+
+
+def _map(path: str) -> pd.DataFrame:
+    import pyarrow as pa
+
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    # split_blocks keeps one block per column so numeric data stays backed by the mapped file;
+    # date32/date64 columns come back as datetime64 rather than objects of datetime.date.
+    return table.to_pandas(split_blocks=True, date_as_object=False)
+
+
+class SessionToken:
+    """Identifies one browser session to the registry; its references drop when the token is collected."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self) -> None:
+        self.id = next(self._ids)
+
+
+def artifact_nbytes(value: Any, _depth: int = 0) -> int:
+    """Approximate memory of an artifact: arrays and frames by their buffers, containers and
+    dataclass-like objects by their contents (a few levels deep); anything else counts as 0."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(index=False) if not isinstance(value, pd.Index) else value.memory_usage()
+        return int(np.sum(usage))
+    if _depth >= 3:
+        return 0
+    if isinstance(value, dict):
+        return sum(artifact_nbytes(item, _depth + 1) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(artifact_nbytes(item, _depth + 1) for item in value[:1000])
+    if hasattr(value, "__dict__"):
+        return sum(artifact_nbytes(item, _depth + 1) for item in vars(value).values())
+    return 0
+
+
+@dataclass
+class _Entry:
+    handle: DatasetHandle
+    owners: set = field(default_factory=set)
+    frame: Optional[pd.DataFrame] = None
+    # Bounded by count and bytes: row-sized indexes on a large dataset would otherwise pin gigabytes.
+    artifacts: LRUCache = field(
+        default_factory=lambda: LRUCache(max_entries=64, max_bytes=MAX_ARTIFACT_BYTES, sizeof=artifact_nbytes)
+    )
+
+
+class DatasetRegistry:
+    """Process-wide, reference-counted registry of datasets keyed by content hash.
+
+    Sessions that upload identical bytes share one read-only mapped frame and its derived
+    artifacts (profiles, indexes, ...). When the last session lets go, both are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, _Entry] = {}
+        self._slots: Dict[int, Dict[str, str]] = {}
+        self._lock = threading.RLock()
+
+    def acquire(self, token: SessionToken, slot: str, handle: DatasetHandle) -> None:
+        """Point a session's ``slot`` (e.g. "dataset") at ``handle``, releasing what it held before."""
+        with self._lock:
+            if token.id not in self._slots:
+                self._slots[token.id] = {}
+                weakref.finalize(token, self._release_owner, token.id)
+            slots = self._slots[token.id]
+            previous = slots.get(slot)
+            if previous == handle.key:
+                return
+            slots[slot] = handle.key
+            entry = self._entries.get(handle.key)
+            if entry is None:
+                entry = self._entries[handle.key] = _Entry(handle)
+            entry.owners.add((token.id, slot))
+            if previous is not None:
+                self._decref(previous, (token.id, slot))
+
+    def release(self, token: SessionToken, slot: str) -> None:
+        with self._lock:
+            key = self._slots.get(token.id, {}).pop(slot, None)
+            if key is not None:
+                self._decref(key, (token.id, slot))
+
+    def _release_owner(self, token_id: int) -> None:
+        with self._lock:
+            for slot, key in self._slots.pop(token_id, {}).items():
+                self._decref(key, (token_id, slot))
+
+    def _decref(self, key: str, owner: Tuple[int, str]) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.owners.discard(owner)
+        if not entry.owners:
+            # Last reference gone: drop the mapped frame and everything derived from it.
+            del self._entries[key]
+            _open_frames.pop(key)
+
+    def held_paths(self) -> set:
+        with self._lock:
+            return {entry.handle.path for entry in self._entries.values()}
+
+    def refcount(self, key: str) -> int:
+        with self._lock:
+            entry = self._entries.get(key)
+            return len({owner for owner, _ in entry.owners}) if entry else 0
+
+    def frame(self, handle: DatasetHandle) -> pd.DataFrame:
+        with self._lock:
+            entry = self._entries.get(handle.key)
+        if entry is None:
+            return _open_frames.get_or_create(handle.key, lambda: _map(handle.path))
+        with self._lock:
+            if entry.frame is None:
+                entry.frame = _map(handle.path)
+            return entry.frame
+
+    def artifact(self, key: str, name: Hashable, build: Callable[[], Any]) -> Any:
+        """A value derived from dataset ``key``, built once and shared while the dataset is held."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return build()
+        return entry.artifacts.get_or_create(name, build)
+
+    def peek_artifact(self, key: str, name: Hashable) -> Any:
+        """An already-built artifact, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or name not in entry.artifacts:
+            return None
+        return entry.artifacts.get(name)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "datasets": len(self._entries),
+                "references": sum(len(entry.owners) for entry in self._entries.values()),
+                "mapped": sum(entry.frame is not None for entry in self._entries.values()),
+            }
+
+
+registry = DatasetRegistry()
+
+
+def load(handle: DatasetHandle) -> pd.DataFrame:
+    """Memory-mapped, read-only view of a stored dataset, shared by every session that asks for it."""
+    try:
+        # Recency for the disk budget in prune().
+        os.utime(handle.path)
+    except OSError:
+        pass
+    return registry.frame(handle)
+
+
+def artifact(key: str, name: Hashable, build: Callable[[], Any]) -> Any:
+    return registry.artifact(key, name, build)
@@ -0,0 +1,99 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+import dataset_store
+
+SAMPLE_ROWS = 200
+GUESS_VALUES = 5
+# Share of sampled values that must parse with the inferred format for a column to qualify.
+MIN_PARSED_RATIO = 0.9
+
+
+@dataclass
+class DateColumns:
+    """Datetime columns of one dataset version: the parsed values and the format each was read with."""
+
+    series: Dict[Any, pd.Series] = field(default_factory=dict)
+    # None for columns that already held dates (datetime dtype or date objects).
+    formats: Dict[Any, Optional[str]] = field(default_factory=dict)
+
+    @property
+    def names(self) -> List[Any]:
+        return list(self.series)
+
+
+def _sample(series: pd.Series, n: int = SAMPLE_ROWS) -> pd.Series:
+    # Evenly spaced rows rather than the head, so a sorted or sectioned file is still represented.
+    positions = np.unique(np.linspace(0, len(series) - 1, num=min(n, len(series)), dtype="int64"))
+    return series.iloc[positions].dropna()
+
+
+def _parsed_ratio(sample: pd.Series, fmt: str) -> float:
+    return float(pd.to_datetime(sample, format=fmt, errors="coerce").notna().mean())
+
+
+def infer_format(sample: pd.Series) -> Optional[str]:
+    """An explicit strptime format that parses most of ``sample``, or None if it is not date-like."""
+    if sample.empty or pd.api.types.infer_dtype(sample, skipna=True) != "string":
+        return None
+    values = sample.astype(str)
+    if not values.str.contains(r"\d", regex=True).all():
+        return None
+    for dayfirst in (False, True):
+        guesses = Counter(
+            guess_datetime_format(value, dayfirst=dayfirst) for value in values.head(GUESS_VALUES)
+        )
+        guesses.pop(None, None)
+        for fmt, _ in guesses.most_common():
+            if _parsed_ratio(values, fmt) >= MIN_PARSED_RATIO:
+                return fmt
+    return None
+
+
+def _convert(series: pd.Series, fmt: str) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Parse each distinct category once, then expand by code.
+        categories = pd.DatetimeIndex(pd.to_datetime(series.cat.categories, format=fmt, errors="coerce"))
+        values = categories.take(series.cat.codes.to_numpy(), allow_fill=True, fill_value=pd.NaT)
+        return pd.Series(values, index=series.index, name=series.name)
+    return pd.to_datetime(series, format=fmt, errors="coerce")
+
+
+def detect_date_columns(df: pd.DataFrame) -> DateColumns:
+    """Find datetime columns from a small sample of each text column and convert only those.
+
+    Columns with a datetime dtype are taken as they are; numeric columns are never treated as dates.
+    """
+    found = DateColumns()
+    for i, name in enumerate(df.columns):
+        series = df.iloc[:, i]
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            found.series[name] = series
+            found.formats[name] = None
+            continue
+        if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            continue
+        if series.dtype == object and pd.api.types.infer_dtype(_sample(series), skipna=True) in ("date", "datetime"):
+            # datetime.date / datetime objects, e.g. from a store mapped before dates became native
+            found.series[name] = pd.to_datetime(series, errors="coerce")
+            found.formats[name] = None
+            continue
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            sample = _sample(pd.Series(series.cat.categories))
+        else:
+            sample = _sample(series)
+        fmt = infer_format(sample)
+        if fmt is not None:
+            found.series[name] = _convert(series, fmt)
+            found.formats[name] = fmt
+    return found
+
+
+def date_columns(dataset_key: str, df: pd.DataFrame) -> DateColumns:
+    """Detected and parsed datetime columns for a dataset version, shared while the dataset is held."""
+    return dataset_store.artifact(dataset_key, "date_columns", lambda: detect_date_columns(df))
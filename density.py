@@ -0,0 +1,43 @@
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# Scatter plots switch to a density image above this many points.
+DENSITY_MIN_POINTS = 200_000
+# Grid cells across and up; the image costs the same to draw whatever the row count.
+GRID_BINS = (400, 250)
+CHUNK_ROWS = 2_000_000
+
+
+def _bounds(values: np.ndarray) -> Tuple[float, float]:
+    low, high = float(np.nanmin(values)), float(np.nanmax(values))
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return low, high
+
+
+def density_grid(
+    x: pd.Series, y: pd.Series, bins: Tuple[int, int] = GRID_BINS
+) -> Tuple[np.ndarray, Tuple[float, float, float, float]]:
+    """Point counts on a ``bins`` grid plus its ``(x0, x1, y0, y1)`` extent, rows with missing values left out.
+
+    Each chunk of rows is mapped to a flat cell number and counted with one ``bincount``.
+    """
+    nx, ny = bins
+    xs = x.to_numpy(dtype="float64", na_value=np.nan)
+    ys = y.to_numpy(dtype="float64", na_value=np.nan)
+    valid = np.isfinite(xs) & np.isfinite(ys)
+    if not valid.any():
+        return np.zeros((ny, nx), dtype="int64"), (0.0, 1.0, 0.0, 1.0)
+    x0, x1 = _bounds(xs[valid])
+    y0, y1 = _bounds(ys[valid])
+    counts = np.zeros(nx * ny, dtype="int64")
+    for start in range(0, len(xs), CHUNK_ROWS):
+        keep = valid[start:start + CHUNK_ROWS]
+        cx = xs[start:start + CHUNK_ROWS][keep]
+        cy = ys[start:start + CHUNK_ROWS][keep]
+        ix = np.minimum(((cx - x0) * (nx / (x1 - x0))).astype("int64"), nx - 1)
+        iy = np.minimum(((cy - y0) * (ny / (y1 - y0))).astype("int64"), ny - 1)
+        counts += np.bincount(iy * nx + ix, minlength=nx * ny)
+    return counts.reshape(ny, nx), (x0, x1, y0, y1)
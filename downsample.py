@@ -0,0 +1,59 @@
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# Line series are capped at this many rendered points; about one per horizontal pixel of a wide chart.
+TARGET_POINTS = 2_000
+
+
+def _as_float(values: pd.Series) -> np.ndarray:
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values.to_numpy(dtype="datetime64[ns]").astype("int64").astype("float64")
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return values.to_numpy(dtype="float64", na_value=np.nan)
+    # Text or categorical x: points are evenly spaced in their current order.
+    return np.arange(len(values), dtype="float64")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, target: int = TARGET_POINTS) -> np.ndarray:
+    """Positions of the points kept by Largest-Triangle-Three-Buckets, in order.
+
+    The first and last points are always kept. Between them the series is cut into
+    ``target - 2`` buckets, and each bucket keeps the point forming the largest triangle with
+    the point kept before it and the mean of the next bucket. Peaks and dips survive.
+    """
+    n = len(x)
+    if target >= n or target < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, target - 1).astype("int64")
+    # Mean of each bucket, used as the third corner for the bucket before it.
+    sizes = np.diff(edges)
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / sizes
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / sizes
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+    kept = np.empty(target, dtype="int64")
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for b in range(target - 2):
+        lo, hi = edges[b], edges[b + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - mean_x[b]) * (by - y[a]) - (x[a] - bx) * (mean_y[b] - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[b + 1] = a
+    return kept
+
+
+def downsample(x: pd.Series, y: pd.Series, target: int = TARGET_POINTS) -> Tuple[pd.Series, pd.Series]:
+    """``x`` and ``y`` (same length, ordered by x, no missing values) reduced to at most ``target`` points."""
+    if len(x) <= target:
+        return x, y
+    kept = lttb_indices(_as_float(x), y.to_numpy(dtype="float64", na_value=np.nan), target)
+    return x.iloc[kept], y.iloc[kept]
+
+
+def points_caption(original: int, rendered: int) -> str:
+    if rendered < original:
+        return f"Showing {rendered:,} of {original:,} points (LTTB downsampled; peaks and dips are kept)."
+    return f"Showing all {original:,} points."
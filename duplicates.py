@@ -0,0 +1,213 @@
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import dataset_store
+
+CHUNK_ROWS = 200_000
+TOP_GROUPS = 10
+# MinHash signature length, split into LSH bands: candidates share all rows of some band.
+# With 4 bands of 8, rows whose field overlap (Jaccard) is ~0.84 are caught half the time, ~0.95 nearly always.
+NUM_PERM = 32
+LSH_BANDS = 4
+NEAR_THRESHOLD = 0.8
+# Near-duplicate search runs over at most this many distinct rows, and skips degenerate buckets.
+NEAR_MAX_ROWS = 200_000
+MAX_BUCKET = 1_000
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_MASK = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _mix(h: np.ndarray, salt: int) -> np.ndarray:
+    # splitmix64 finaliser: spreads one column's hash before it is folded into the row hash.
+    with np.errstate(over="ignore"):
+        z = h + _MIX * np.uint64(salt + 1)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def _column_hash(series: pd.Series) -> np.ndarray:
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+def row_fingerprints(data: pd.DataFrame, columns: Optional[Sequence[Any]] = None) -> np.ndarray:
+    """One 64-bit fingerprint per row, built a column at a time so width never multiplies memory."""
+    positions = _positions(data, columns)
+    fingerprint = np.zeros(len(data), dtype="uint64")
+    with np.errstate(over="ignore"):
+        for salt, pos in enumerate(positions):
+            fingerprint = fingerprint * np.uint64(31) + _mix(_column_hash(data.iloc[:, pos]), salt)
+    return fingerprint
+
+
+def _positions(data: pd.DataFrame, columns: Optional[Sequence[Any]]) -> List[int]:
+    if not columns:
+        return list(range(data.shape[1]))
+    wanted = set(columns)
+    return [i for i, name in enumerate(data.columns) if name in wanted]
+
+
+def count_fingerprints(
+    data: pd.DataFrame, columns: Optional[Sequence[Any]] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Distinct row fingerprints in order of first appearance, with their counts and first row position.
+
+    Fingerprints are computed in row chunks into one 8-byte-per-row array, then counted in a
+    single hash-table pass, so the cost stays linear in the number of rows.
+    """
+    fingerprints = np.empty(len(data), dtype="uint64")
+    for start in range(0, len(data), CHUNK_ROWS):
+        chunk = data.iloc[start:start + CHUNK_ROWS]
+        fingerprints[start:start + len(chunk)] = row_fingerprints(chunk, columns)
+    codes, keys = pd.factorize(fingerprints)
+    counts = np.bincount(codes, minlength=len(keys)).astype("int64")
+    # Codes are numbered by first appearance, so a row is a first occurrence exactly when its
+    # code exceeds every code before it.
+    seen = np.maximum.accumulate(codes)
+    first = np.flatnonzero(np.r_[True, codes[1:] > seen[:-1]]) if len(codes) else np.empty(0, dtype="int64")
+    return np.asarray(keys, dtype="uint64"), counts, first.astype("int64")
+
+
+def _minhash(data: pd.DataFrame, rows: np.ndarray, positions: List[int], num_perm: int, seed: int) -> np.ndarray:
+    """MinHash signatures of rows seen as sets of ``column=value`` tokens."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, size=num_perm, dtype="uint64") | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=num_perm, dtype="uint64")
+    signature = np.full((len(rows), num_perm), _MASK, dtype="uint64")
+    with np.errstate(over="ignore"):
+        for salt, pos in enumerate(positions):
+            series = data.iloc[rows, pos]
+            if not pd.api.types.is_numeric_dtype(series.dtype):
+                # Case and surrounding spaces should not make two records look different.
+                series = series.astype("string").str.strip().str.lower()
+            token = _mix(_column_hash(series), salt)
+            np.minimum(signature, token[:, None] * a + b, out=signature)
+    return signature
+
+
+def _components(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[left], labels[right])
+        before = labels.copy()
+        np.minimum.at(labels, left, low)
+        np.minimum.at(labels, right, low)
+        labels = labels[labels]
+        if np.array_equal(labels, before):
+            return labels
+
+
+def near_duplicate_labels(
+    signature: np.ndarray, bands: int = LSH_BANDS, threshold: float = NEAR_THRESHOLD
+) -> np.ndarray:
+    """Cluster label per signature row; rows in one cluster are estimated near-duplicates."""
+    n, num_perm = signature.shape
+    width = num_perm // bands
+    left_parts, right_parts = [], []
+    for band in range(bands):
+        band_hash = np.zeros(n, dtype="uint64")
+        with np.errstate(over="ignore"):
+            for j in range(band * width, (band + 1) * width):
+                band_hash = _mix(band_hash ^ signature[:, j], band)
+        order = np.argsort(band_hash, kind="stable")
+        sorted_hash = band_hash[order]
+        starts = np.flatnonzero(np.r_[True, sorted_hash[1:] != sorted_hash[:-1]])
+        sizes = np.diff(np.r_[starts, n])
+        group_first = np.repeat(order[starts], sizes)
+        group_size = np.repeat(sizes, sizes)
+        keep = (group_first != order) & (group_size <= MAX_BUCKET)
+        left_parts.append(group_first[keep])
+        right_parts.append(order[keep])
+    left = np.concatenate(left_parts)
+    right = np.concatenate(right_parts)
+    # Verify candidates: the share of equal signature slots estimates their Jaccard similarity.
+    similarity = (signature[left] == signature[right]).mean(axis=1) if len(left) else np.empty(0)
+    accepted = similarity >= threshold
+    return _components(n, left[accepted], right[accepted])
+
+
+@dataclass
+class DuplicateReport:
+    n_rows: int
+    distinct_rows: int
+    columns: Optional[Tuple[Any, ...]]
+    # Largest groups: first row position, number of rows, and distinct variants (1 for exact copies).
+    groups: pd.DataFrame
+    near: bool = False
+    # True when near-duplicate search only covered the first NEAR_MAX_ROWS distinct rows.
+    near_truncated: bool = False
+
+    @property
+    def duplicate_rows(self) -> int:
+        """Rows that repeat an earlier one exactly (on the key columns)."""
+        return self.n_rows - self.distinct_rows
+
+    @property
+    def duplicate_pct(self) -> float:
+        return self.duplicate_rows / self.n_rows * 100 if self.n_rows else 0.0
+
+    def group_rows(self, data: pd.DataFrame) -> pd.DataFrame:
+        """One example row per top group, with its size."""
+        if self.groups.empty:
+            return pd.DataFrame()
+        rows = data.iloc[self.groups["first_row"].to_numpy()]
+        if self.columns:
+            rows = rows[[col for col in rows.columns if col in self.columns]]
+        out = rows.reset_index(drop=True)
+        out.insert(0, "Rows", self.groups["rows"].to_numpy())
+        if self.near:
+            out.insert(1, "Variants", self.groups["variants"].to_numpy())
+        return out
+
+
+def find_duplicates(
+    data: pd.DataFrame,
+    columns: Optional[Sequence[Any]] = None,
+    near: bool = False,
+    top: int = TOP_GROUPS,
+    seed: int = 0,
+) -> DuplicateReport:
+    """Exact duplicate groups from row fingerprints, optionally merged into MinHash/LSH near-duplicate groups.
+
+    Memory is one 8-byte fingerprint per row plus the distinct rows, whatever the number of columns.
+    """
+    keys, counts, first = count_fingerprints(data, columns)
+    columns = tuple(columns) if columns else None
+    truncated = False
+    if near and len(keys):
+        order = np.argsort(first, kind="stable")[:NEAR_MAX_ROWS]
+        truncated = len(keys) > NEAR_MAX_ROWS
+        signature = _minhash(data, first[order], _positions(data, columns), NUM_PERM, seed)
+        labels = near_duplicate_labels(signature)
+        _, cluster = np.unique(labels, return_inverse=True)
+        rows = np.bincount(cluster, weights=counts[order]).astype("int64")
+        variants = np.bincount(cluster)
+        group_first = np.full(len(rows), np.iinfo("int64").max, dtype="int64")
+        np.minimum.at(group_first, cluster, first[order])
+        groups = pd.DataFrame({"first_row": group_first, "rows": rows, "variants": variants})
+    else:
+        groups = pd.DataFrame({"first_row": first, "rows": counts, "variants": np.ones(len(counts), dtype="int64")})
+    groups = groups[groups["rows"] > 1].nlargest(top, "rows").reset_index(drop=True)
+    return DuplicateReport(len(data), len(keys), columns, groups, near, truncated)
+
+
+def _artifact_name(columns: Optional[Sequence[Any]], near: bool) -> Tuple[Any, ...]:
+    return ("duplicates", tuple(columns) if columns else None, near)
+
+
+def get_duplicates(
+    dataset_key: str, data: pd.DataFrame, columns: Optional[Sequence[Any]] = None, near: bool = False
+) -> DuplicateReport:
+    """Duplicate report for a dataset version and key columns, shared while the dataset is held."""
+    return dataset_store.artifact(dataset_key, _artifact_name(columns, near), lambda: find_duplicates(data, columns, near))
+
+
+def cached_duplicates(
+    dataset_key: str, columns: Optional[Sequence[Any]] = None, near: bool = False
+) -> Optional[DuplicateReport]:
+    """Duplicate report if it has already been computed, else None."""
+    return dataset_store.registry.peek_artifact(dataset_key, _artifact_name(columns, near))
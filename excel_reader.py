@@ -0,0 +1,91 @@
+import io
+import zipfile
+from itertools import islice
+from typing import List, Optional, Sequence
+from xml.etree import ElementTree
+
+import pandas as pd
+
+try:
+    import python_calamine  # noqa: F401
+    HAS_CALAMINE = True
+except Exception:
+    HAS_CALAMINE = False
+
+XLS_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+
+def is_legacy_xls(data: bytes) -> bool:
+    return bytes(data[:8]) == XLS_MAGIC
+
+
+def list_sheets(data: bytes) -> List[str]:
+    """Sheet names of a workbook, read from its index without loading any sheet."""
+    if is_legacy_xls(data):
+        import xlrd
+
+        book = xlrd.open_workbook(file_contents=data, on_demand=True)
+        try:
+            return book.sheet_names()
+        finally:
+            book.release_resources()
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        with archive.open("xl/workbook.xml") as handle:
+            return [
+                elem.attrib["name"]
+                for _, elem in ElementTree.iterparse(handle)
+                if elem.tag.rsplit("}", 1)[-1] == "sheet" and "name" in elem.attrib
+            ]
+
+
+def _read_xlsx_rows(
+    data: bytes,
+    sheet: Optional[str],
+    nrows: Optional[int],
+    columns: Optional[Sequence[str]],
+) -> pd.DataFrame:
+    import openpyxl
+
+    # read_only streams rows from the sheet XML instead of building the full object model.
+    book = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        ws = book[sheet] if sheet else book.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        names = [f"Unnamed: {i}" if h is None else str(h) for i, h in enumerate(header)]
+        if columns:
+            wanted = set(columns)
+            positions = [i for i, name in enumerate(names) if name in wanted]
+        else:
+            positions = list(range(len(names)))
+        body = rows if nrows is None else islice(rows, nrows)
+        records = [tuple(row[i] if i < len(row) else None for i in positions) for row in body]
+    finally:
+        book.close()
+    df = pd.DataFrame.from_records(records, columns=[names[i] for i in positions])
+    return df.infer_objects()
+
+
+def read_sheet(
+    data: bytes,
+    sheet: Optional[str] = None,
+    nrows: Optional[int] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Parse one sheet, optionally only its first ``nrows`` rows and a subset of columns."""
+    usecols = list(columns) if columns else None
+    if HAS_CALAMINE:
+        return pd.read_excel(
+            io.BytesIO(data), sheet_name=sheet or 0, nrows=nrows, usecols=usecols, engine="calamine"
+        )
+    if is_legacy_xls(data):
+        return pd.read_excel(io.BytesIO(data), sheet_name=sheet or 0, nrows=nrows, usecols=usecols)
+    return _read_xlsx_rows(data, sheet, nrows, columns)
+
+
+def sheet_columns(data: bytes, sheet: Optional[str] = None) -> List[str]:
+    """Header row of a sheet."""
+    return [str(col) for col in read_sheet(data, sheet, nrows=0).columns]
@@ -0,0 +1,219 @@
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import dataset_store
+from cache import LRUCache
+
+# Boolean row masks keyed by (dataset, conditions). One byte per row, so the cache is bounded
+# by size: switching chart type or axes reuses the mask instead of re-evaluating the filter.
+MASK_CACHE_BYTES = 512 * 1024 * 1024
+_masks = LRUCache(max_entries=64, max_bytes=MASK_CACHE_BYTES, sizeof=lambda value: value.nbytes)
+
+
+def _position_dtype(n: int) -> str:
+    return "int32" if n < 2 ** 31 else "int64"
+
+
+@dataclass
+class SortedIndex:
+    """Row positions of a numeric column ordered by value, missing values left out."""
+
+    n_rows: int
+    values: np.ndarray
+    positions: np.ndarray
+
+    def range_positions(self, low: Any, high: Any) -> np.ndarray:
+        """Positions of rows with ``low <= value <= high``: two binary searches and a slice."""
+        start = np.searchsorted(self.values, low, side="left")
+        stop = np.searchsorted(self.values, high, side="right")
+        return self.positions[start:stop]
+
+
+@dataclass
+class InvertedIndex:
+    """Row positions grouped by value: rows of ``values[i]`` are ``positions[offsets[i]:offsets[i + 1]]``."""
+
+    n_rows: int
+    values: List[Any]
+    positions: np.ndarray
+    offsets: np.ndarray
+
+    def value_positions(self, selected: Sequence[Any]) -> np.ndarray:
+        lookup = pd.Index(self.values).get_indexer(list(selected))
+        parts = [self.positions[self.offsets[i]:self.offsets[i + 1]] for i in lookup[lookup >= 0]]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=self.positions.dtype)
+
+
+def build_sorted_index(series: pd.Series) -> SortedIndex:
+    valid = ~series.isna().to_numpy()
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()[valid]
+    else:
+        # Nullable extension dtypes: missing values are already dropped by ``valid``.
+        values = series.to_numpy(dtype="float64", na_value=np.nan)[valid]
+    order = np.argsort(values, kind="stable")
+    positions = np.flatnonzero(valid)[order].astype(_position_dtype(len(series)))
+    return SortedIndex(len(series), values[order], positions)
+
+
+def build_inverted_index(series: pd.Series) -> InvertedIndex:
+    # Works on category codes directly for categorical columns; only values that occur are kept.
+    codes, uniques = pd.factorize(series, sort=True)
+    valid = codes >= 0
+    order = np.argsort(codes[valid], kind="stable")
+    positions = np.flatnonzero(valid)[order].astype(_position_dtype(len(series)))
+    counts = np.bincount(codes[valid], minlength=len(uniques))
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    return InvertedIndex(len(series), list(uniques), positions, offsets)
+
+
+def get_sorted_index(dataset_key: str, data: pd.DataFrame, column: Any) -> SortedIndex:
+    """Sorted index of a numeric column, built on first use and kept with the dataset."""
+    return dataset_store.artifact(dataset_key, ("sorted_index", column), lambda: build_sorted_index(data[column]))
+
+
+def get_inverted_index(dataset_key: str, data: pd.DataFrame, column: Any) -> InvertedIndex:
+    """Value-to-rows index of a column, built on first use and kept with the dataset."""
+    return dataset_store.artifact(
+        dataset_key, ("inverted_index", column), lambda: build_inverted_index(data[column])
+    )
+
+
+def _to_mask(n_rows: int, positions: np.ndarray) -> np.ndarray:
+    mask = np.zeros(n_rows, dtype=bool)
+    mask[positions] = True
+    return mask
+
+
+OPERATORS = ("range", "values", "is_null", "not_null", "contains")
+
+
+@dataclass(frozen=True)
+class Condition:
+    """One filter condition: ``range`` (low, high), ``values`` (v1, v2, ...), ``is_null``,
+    ``not_null`` or ``contains`` (text,)."""
+
+    column: Any
+    op: str
+    args: Tuple[Any, ...] = ()
+
+    def label(self) -> str:
+        if self.op == "range":
+            return f"{self.column} between {self.args[0]} and {self.args[1]}"
+        if self.op == "values":
+            shown = ", ".join(map(str, self.args[:3])) + (", ..." if len(self.args) > 3 else "")
+            return f"{self.column} in ({shown})"
+        if self.op == "contains":
+            return f"{self.column} contains '{self.args[0]}'"
+        return f"{self.column} {'is' if self.op == 'is_null' else 'is not'} missing"
+
+
+@dataclass
+class FilterResult:
+    mask: np.ndarray
+    # (condition, rows left after it) in the order the conditions were applied.
+    steps: List[Tuple[Condition, int]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.mask.nbytes
+
+
+def _null_positions(dataset_key: str, data: pd.DataFrame, column: Any) -> np.ndarray:
+    return dataset_store.artifact(
+        dataset_key, ("null_positions", column), lambda: np.flatnonzero(data[column].isna().to_numpy())
+    )
+
+
+def _estimate(dataset_key: str, data: pd.DataFrame, cond: Condition) -> int:
+    """Rows a condition keeps on its own, from the indexes; unknown (all rows) for text search."""
+    if cond.op == "range":
+        return len(get_sorted_index(dataset_key, data, cond.column).range_positions(*cond.args))
+    if cond.op == "values":
+        index = get_inverted_index(dataset_key, data, cond.column)
+        lookup = pd.Index(index.values).get_indexer(list(cond.args))
+        lookup = lookup[lookup >= 0]
+        return int((index.offsets[lookup + 1] - index.offsets[lookup]).sum())
+    if cond.op == "is_null":
+        return len(_null_positions(dataset_key, data, cond.column))
+    if cond.op == "not_null":
+        return len(data) - len(_null_positions(dataset_key, data, cond.column))
+    return len(data)
+
+
+def _first_positions(dataset_key: str, data: pd.DataFrame, cond: Condition) -> np.ndarray:
+    """Sorted row positions matching the first (most selective) condition, read off an index."""
+    if cond.op == "range":
+        return np.sort(get_sorted_index(dataset_key, data, cond.column).range_positions(*cond.args))
+    if cond.op == "values":
+        return np.sort(get_inverted_index(dataset_key, data, cond.column).value_positions(cond.args))
+    if cond.op == "is_null":
+        return _null_positions(dataset_key, data, cond.column)
+    return _narrow(data, cond, np.arange(len(data)))
+
+
+def _narrow(data: pd.DataFrame, cond: Condition, positions: np.ndarray) -> np.ndarray:
+    """The subset of ``positions`` matching ``cond``, evaluated on those rows only."""
+    series = data[cond.column]
+    if len(positions) < len(data):
+        series = series.iloc[positions]
+    if cond.op == "range":
+        keep = series.between(*cond.args).to_numpy(dtype=bool, na_value=False)
+    elif cond.op == "values":
+        keep = series.isin(cond.args).to_numpy(dtype=bool)
+    elif cond.op == "is_null":
+        keep = series.isna().to_numpy()
+    elif cond.op == "not_null":
+        keep = series.notna().to_numpy()
+    elif cond.op == "contains":
+        text = series.astype("string").str.contains(str(cond.args[0]), case=False, regex=False)
+        keep = text.to_numpy(dtype=bool, na_value=False)
+    else:
+        raise ValueError(f"op must be one of {OPERATORS}, not {cond.op!r}")
+    return positions[keep]
+
+
+def apply_conditions(dataset_key: str, data: pd.DataFrame, conditions: Sequence[Condition]) -> FilterResult:
+    """Row mask for the AND of ``conditions``, cached per dataset and condition set.
+
+    Conditions run from the most selective (estimated from the column indexes) to the least.
+    The first is read off an index; each later one is evaluated only on the rows still left,
+    and evaluation stops once none are.
+    """
+    ordered = sorted(dict.fromkeys(conditions), key=lambda cond: _estimate(dataset_key, data, cond))
+    key = (dataset_key, "conditions", tuple(ordered))
+
+    def build() -> FilterResult:
+        positions = _first_positions(dataset_key, data, ordered[0])
+        steps = [(ordered[0], len(positions))]
+        for cond in ordered[1:]:
+            if len(positions):
+                positions = _narrow(data, cond, positions)
+            steps.append((cond, len(positions)))
+        return FilterResult(_to_mask(len(data), positions), steps)
+
+    return _masks.get_or_create(key, build)
+
+
+def filter_values(dataset_key: str, data: pd.DataFrame, column: Any) -> List[Any]:
+    """Sorted distinct values offered by a value filter, read off the column's inverted index."""
+    return get_inverted_index(dataset_key, data, column).values
+
+
+def select_rows(data: pd.DataFrame, mask: Optional[np.ndarray], columns: Sequence[Any]) -> pd.DataFrame:
+    """The given columns of the masked rows.
+
+    Without a mask this is a lazy column selection, not a copy; with one, only the requested
+    columns of the kept rows are materialised.
+    """
+    columns = list(dict.fromkeys(col for col in columns if col is not None))
+    if mask is None:
+        return data[columns]
+    return data.loc[mask, columns]
+
+
+def clear_masks() -> None:
+    _masks.clear()
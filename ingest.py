@@ -0,0 +1,465 @@
+import hashlib
+import io
+import os
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+import dataset_store
+import jobs
+from cache import LRUCache
+from dataset_store import DatasetHandle
+from compaction import compact_dtypes
+from compression import DecompressionStats, detect_compression, member_name, open_stream, peek, spill_to_tempfile
+from excel_reader import list_sheets, read_sheet, sheet_columns
+from profiling import get_profile
+from sniff import SAMPLE_BYTES, FormatGuess, sniff
+
+HASH_BLOCK_BYTES = 8 * 1024 * 1024
+STREAM_BUFFER_BYTES = 1024 * 1024
+COLUMNAR_FORMATS = ("parquet", "feather", "arrow", "arrow_stream")
+DEFAULT_CHUNK_ROWS = 100_000
+MIN_CHUNK_ROWS = 1_000
+
+
+def content_hash(data: bytes) -> str:
+    """Return a short hex digest of the uploaded bytes."""
+    digest = hashlib.blake2b(digest_size=16)
+    view = memoryview(data)
+    for start in range(0, len(view), HASH_BLOCK_BYTES):
+        digest.update(view[start:start + HASH_BLOCK_BYTES])
+    return digest.hexdigest()
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Deep memory footprint of a DataFrame in bytes."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+@dataclass
+class IngestProgress:
+    rows: int
+    bytes_read: int
+    total_bytes: int
+    elapsed: float
+
+    @property
+    def fraction(self) -> float:
+        return min(self.bytes_read / self.total_bytes, 1.0) if self.total_bytes else 1.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.bytes_read / 1024 ** 2 / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class OverviewAccumulator:
+    """Overview metrics (rows, missing cells, dtypes) built incrementally from chunks."""
+
+    def __init__(self) -> None:
+        self.n_rows = 0
+        self.missing: Optional[pd.Series] = None
+        self.dtypes: Dict[str, Any] = {}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        missing = chunk.isna().sum()
+        self.missing = missing if self.missing is None else self.missing.add(missing, fill_value=0)
+        for col, dtype in chunk.dtypes.items():
+            seen = self.dtypes.get(col)
+            # Chunks may disagree (e.g. int in one, float once NaN appears); keep the common type.
+            self.dtypes[col] = dtype if seen is None or seen == dtype else _common_dtype(seen, dtype)
+        self.n_rows += len(chunk)
+
+    def summary(self) -> Dict[str, Any]:
+        missing = self.missing.astype("int64") if self.missing is not None else pd.Series(dtype="int64")
+        n_cols = len(self.dtypes)
+        return {
+            "n_rows": self.n_rows,
+            "n_cols": n_cols,
+            "missing_cells": int(missing.sum()),
+            "missing_by_column": missing,
+            "dtypes": pd.Series({col: str(dtype) for col, dtype in self.dtypes.items()}, dtype="object"),
+        }
+
+
+def _common_dtype(a: Any, b: Any) -> Any:
+    try:
+        return pd.api.types.find_common_type([a, b])
+    except TypeError:
+        return object
+
+
+@dataclass
+class IngestResult:
+    # The parsed frame lives here only until it is spilled to the dataset store.
+    df: Optional[pd.DataFrame]
+    key: str = ""
+    overview: Dict[str, Any] = field(default_factory=dict)
+    truncated: bool = False
+    memory_report: Optional[pd.DataFrame] = None
+    guess: Optional[FormatGuess] = None
+    handle: Optional[DatasetHandle] = None
+    decompression: Optional[DecompressionStats] = None
+
+
+def overview_from_frame(df: pd.DataFrame) -> Dict[str, Any]:
+    acc = OverviewAccumulator()
+    acc.update(df)
+    return acc.summary()
+
+
+# Ingest results (store handle, overview, reports), keyed by content hash + parse options.
+# Shared by all sessions in the process; the data itself lives in the dataset store.
+parse_cache = LRUCache(max_entries=32)
+
+# Streamlit keeps the same file_id for an upload across reruns, so we only hash it once.
+_digest_by_file_id = LRUCache(max_entries=64)
+
+
+# Schemas, sheet names and header rows, so reruns do not reopen the file to list them.
+_metadata_cache = LRUCache(max_entries=64)
+
+
+def _upload_digest(uploaded_file: Any, data: bytes) -> str:
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id is None:
+        return content_hash(data)
+    return _digest_by_file_id.get_or_create((file_id, len(data)), lambda: content_hash(data))
+
+
+def dataset_key(digest: str, options: Dict[str, Any]) -> str:
+    """Combine a content digest and parse options into a stable dataset key."""
+    opts = repr(sorted(options.items())).encode("utf-8")
+    return f"{digest}-{hashlib.blake2b(opts, digest_size=6).hexdigest()}"
+
+
+def _arrow_table(data: Union[bytes, str], fmt: str, columns: Optional[Sequence[str]] = None):
+    import pyarrow as pa
+
+    # A str is a path to a spilled (decompressed) file, which can be memory-mapped.
+    source = pa.memory_map(data, "r") if isinstance(data, str) else pa.BufferReader(data)
+    columns = list(columns) if columns else None
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(source, columns=columns)
+    if fmt == "feather":
+        import pyarrow.feather as feather
+
+        # Handles both Feather v1 and v2 (the Arrow IPC file format).
+        return feather.read_table(source, columns=columns)
+    if fmt == "arrow_stream":
+        table = pa.ipc.open_stream(source).read_all()
+    else:
+        table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+
+def columnar_schema(data: bytes, fmt: str) -> List[str]:
+    """Column names of a Parquet/Feather/Arrow payload, read from its metadata only."""
+    import pyarrow as pa
+
+    source = pa.BufferReader(data)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return list(pq.read_schema(source).names)
+    if fmt == "arrow_stream":
+        return list(pa.ipc.open_stream(source).schema.names)
+    if fmt == "feather" and not bytes(data[:6]).startswith(b"ARROW1"):
+        return list(_arrow_table(data, fmt).schema.names)
+    return list(pa.ipc.open_file(source).schema.names)
+
+
+def read_columnar(data: Union[bytes, str], fmt: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read a columnar payload without row parsing, optionally projecting columns."""
+    return _arrow_table(data, fmt, columns).to_pandas()
+
+
+def csv_kwargs(guess: FormatGuess, engine: Optional[str] = None) -> Dict[str, Any]:
+    """read_csv arguments for a sniffed dialect and the requested engine."""
+    kwargs = guess.read_csv_kwargs()
+    # The pyarrow engine mishandles skiprows with a header and ignores the decimal mark.
+    if engine == "pyarrow" and not guess.skiprows and guess.decimal == ".":
+        kwargs["engine"] = "pyarrow"
+    return kwargs
+
+
+def detect_format(data: bytes, filename: Optional[str] = None, **options: Any) -> FormatGuess:
+    """Sniff the upload, letting an explicit ``format`` option override the detected reader.
+
+    Compressed uploads are sniffed on the first decompressed bytes.
+    """
+    codec = detect_compression(data)
+    if codec is None:
+        guess = sniff(data, filename)
+    else:
+        inner_name = member_name(data, codec) or (filename.rsplit(".", 1)[0] if filename else None)
+        # One byte past the sample tells sniff whether it saw the whole payload.
+        guess = sniff(peek(data, codec, SAMPLE_BYTES + 1), inner_name)
+        guess.compression = codec
+    if options.get("format"):
+        guess.reader = options["format"]
+    return guess
+
+
+class _CheckedReader(io.RawIOBase):
+    """Calls ``check`` before every read so a cancel request stops the parser mid-file."""
+
+    def __init__(self, stream: BinaryIO, check: Callable[[], None]) -> None:
+        self._stream = stream
+        self._check = check
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        self._check()
+        data = self._stream.read(len(buffer))
+        n = len(data)
+        buffer[:n] = data
+        return n
+
+    def close(self) -> None:
+        self._stream.close()
+        super().close()
+
+
+def _csv_source(
+    data: bytes, codec: Optional[str], check: Optional[Callable[[], None]] = None
+) -> Tuple[BinaryIO, Callable[[], int], Optional[DecompressionStats]]:
+    """A binary stream over the CSV text plus a callable giving the position in the upload bytes."""
+    if codec is None:
+        buffer = io.BytesIO(data)
+        if check is None:
+            return buffer, buffer.tell, None
+        return io.BufferedReader(_CheckedReader(buffer, check), STREAM_BUFFER_BYTES), buffer.tell, None
+    stream = open_stream(data, codec)
+    raw = stream if check is None else _CheckedReader(stream, check)
+    return io.BufferedReader(raw, STREAM_BUFFER_BYTES), lambda: stream.compressed_position, stream.stats
+
+
+def _read(
+    data: bytes,
+    guess: FormatGuess,
+    check: Optional[Callable[[], None]] = None,
+    **options: Any,
+) -> Tuple[pd.DataFrame, Optional[DecompressionStats]]:
+    if guess.compression is not None and guess.reader != "csv":
+        # Parquet, Arrow and Excel need random access: decompress to a temporary file first.
+        path, stats = spill_to_tempfile(data, guess.compression)
+        try:
+            if guess.reader in COLUMNAR_FORMATS:
+                df = read_columnar(path, guess.reader, options.get("columns"))
+            else:
+                with open(path, "rb") as handle:
+                    df = read_sheet(handle.read(), options.get("sheet"), options.get("nrows"), options.get("columns"))
+        finally:
+            os.remove(path)
+        return df, stats
+    if guess.reader in COLUMNAR_FORMATS:
+        return read_columnar(data, guess.reader, options.get("columns")), None
+    if guess.reader == "excel":
+        return read_sheet(data, options.get("sheet"), options.get("nrows"), options.get("columns")), None
+    source, _, stats = _csv_source(data, guess.compression, check)
+    with source:
+        df = pd.read_csv(source, **csv_kwargs(guess, options.get("csv_engine")))
+    return df, stats
+
+
+def parse_bytes(data: bytes, guess: Optional[FormatGuess] = None, **options: Any) -> pd.DataFrame:
+    """Parse raw upload bytes into a DataFrame with the reader chosen by sniffing."""
+    guess = guess or detect_format(data, **options)
+    return _read(data, guess, **options)[0]
+
+
+def read_csv_chunked(
+    data: bytes,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    max_memory_mb: Optional[float] = None,
+    on_progress: Optional[Callable[[IngestProgress], None]] = None,
+    compression: Optional[str] = None,
+    check: Optional[Callable[[], None]] = None,
+    **read_kwargs: Any,
+) -> IngestResult:
+    """Stream a CSV in chunks, building overview metrics as chunks arrive.
+
+    Only as many rows as fit in ``max_memory_mb`` are retained. Half of the ceiling is
+    reserved for the final concatenation, and chunk size shrinks so that a single chunk
+    never takes more than an eighth of it. Overview metrics always cover the whole file.
+    Compressed payloads are decompressed on the fly; progress is measured on the compressed bytes.
+    ``check`` is called between reads and may raise to abandon the parse.
+    """
+    budget = max_memory_mb * 1024 ** 2 if max_memory_mb else None
+    retain_budget = budget / 2 if budget else None
+    buffer, position, stats = _csv_source(data, compression, check)
+    acc = OverviewAccumulator()
+    kept: List[pd.DataFrame] = []
+    kept_bytes = 0
+    truncated = False
+    start = time.perf_counter()
+
+    rows = chunk_rows
+    with buffer, pd.read_csv(buffer, chunksize=chunk_rows, **read_kwargs) as reader:
+        while True:
+            try:
+                chunk = reader.get_chunk(rows)
+            except StopIteration:
+                break
+            acc.update(chunk)
+            chunk_bytes = frame_nbytes(chunk)
+            if budget and len(chunk) and chunk_bytes > budget / 8:
+                rows = max(MIN_CHUNK_ROWS, int(len(chunk) * (budget / 8) / chunk_bytes))
+            if not truncated:
+                if retain_budget is None or kept_bytes + chunk_bytes <= retain_budget:
+                    kept.append(chunk)
+                    kept_bytes += chunk_bytes
+                else:
+                    truncated = True
+            del chunk
+            if on_progress is not None:
+                on_progress(IngestProgress(acc.n_rows, position(), len(data), time.perf_counter() - start))
+
+    if kept:
+        df = pd.concat(kept, ignore_index=True)
+    else:
+        header_source, _, _ = _csv_source(data, compression)
+        with header_source:
+            df = pd.read_csv(header_source, nrows=0, **read_kwargs)
+    return IngestResult(df=df, overview=acc.summary(), truncated=truncated, decompression=stats)
+
+
+def _parse(
+    data: bytes,
+    guess: FormatGuess,
+    on_progress: Optional[Callable[[IngestProgress], None]],
+    check: Optional[Callable[[], None]] = None,
+    **options: Any,
+) -> IngestResult:
+    if options.get("streaming") and guess.reader == "csv":
+        return read_csv_chunked(
+            data,
+            chunk_rows=options.get("chunk_rows", DEFAULT_CHUNK_ROWS),
+            max_memory_mb=options.get("max_memory_mb"),
+            on_progress=on_progress,
+            compression=guess.compression,
+            check=check,
+            **guess.read_csv_kwargs(),
+        )
+    df, stats = _read(data, guess, check, **options)
+    return IngestResult(df=df, overview=overview_from_frame(df), decompression=stats)
+
+
+def _ingest(
+    data: bytes,
+    filename: Optional[str],
+    on_progress: Optional[Callable[[IngestProgress], None]],
+    check: Optional[Callable[[], None]] = None,
+    **options: Any,
+) -> IngestResult:
+    # Every upload is sniffed once and then parsed exactly once with the chosen reader.
+    guess = detect_format(data, filename, **options)
+    result = _parse(data, guess, on_progress, check, **options)
+    result.guess = guess
+    if check is not None:
+        check()
+    if options.get("compact"):
+        result.df, result.memory_report = compact_dtypes(result.df)
+        result.overview["dtypes"] = result.df.dtypes.astype(str)
+    return result
+
+
+def _load(
+    uploaded_file: Any,
+    data: bytes,
+    on_progress: Optional[Callable[[IngestProgress], None]],
+    check: Optional[Callable[[], None]],
+    options: Dict[str, Any],
+) -> IngestResult:
+    key = dataset_key(_upload_digest(uploaded_file, data), options)
+
+    def build() -> IngestResult:
+        result = _ingest(data, getattr(uploaded_file, "name", None), on_progress, check, **options)
+        result.key = key
+        if check is not None:
+            check()
+        result.handle = dataset_store.put(key, result.df)
+        result.df = None
+        return result
+
+    cached = parse_cache.peek(key)
+    if cached is not None and not os.path.exists(cached.handle.path):
+        # The store file was pruned to stay within its disk budget; parse again.
+        parse_cache.pop(key)
+    # A cancelled build raises out of get_or_create, so nothing partial is cached.
+    return parse_cache.get_or_create(key, build)
+
+
+def load_upload(
+    uploaded_file: Any,
+    on_progress: Optional[Callable[[IngestProgress], None]] = None,
+    **options: Any,
+) -> IngestResult:
+    """Parse an upload, reusing a cached result when the same bytes and options were seen before."""
+    return _load(uploaded_file, uploaded_file.getvalue(), on_progress, None, options)
+
+
+def _ingest_job(job: jobs.Job, uploaded_file: Any, data: bytes, owner: Any, options: Dict[str, Any]) -> IngestResult:
+    job.set_state("parsing")
+    result = _load(uploaded_file, data, job.report, job.check, options)
+    job.set_state("profiling")
+    token = owner()
+    if token is None:
+        # The session went away while parsing; nobody is waiting for the profile.
+        raise jobs.Cancelled()
+    # Hold the dataset for the session so the profile is kept in the registry with it.
+    dataset_store.registry.acquire(token, "ingest", result.handle)
+    del token
+    get_profile(result.key, dataset_store.load(result.handle), check=job.check)
+    return result
+
+
+def start_ingest(uploaded_file: Any, token: dataset_store.SessionToken, **options: Any) -> jobs.Job:
+    """Parse and profile an upload on the background pool.
+
+    The job goes queued -> parsing -> profiling -> done and can be cancelled at any point.
+    Jobs are per session; the parsed result is still shared through the parse cache.
+    """
+    data = uploaded_file.getvalue()
+    upload_id = getattr(uploaded_file, "file_id", None) or (getattr(uploaded_file, "name", None), len(data))
+    key = ("ingest", token.id, upload_id, repr(sorted(options.items())))
+    # Only a weak reference to the token, so a running job never keeps a closed session alive.
+    return jobs.start(key, _ingest_job, uploaded_file, data, weakref.ref(token), options)
+
+
+def upload_columns(uploaded_file: Any, fmt: str, sheet: Optional[str] = None) -> List[str]:
+    """Column names of a columnar file or workbook sheet, without loading its rows."""
+    data = uploaded_file.getvalue()
+    key = (_upload_digest(uploaded_file, data), "columns", sheet)
+    if fmt == "excel":
+        return _metadata_cache.get_or_create(key, lambda: sheet_columns(data, sheet))
+    return _metadata_cache.get_or_create(key, lambda: columnar_schema(data, fmt))
+
+
+def upload_sheets(uploaded_file: Any) -> List[str]:
+    """Sheet names of an uploaded workbook, without loading any sheet."""
+    data = uploaded_file.getvalue()
+    key = (_upload_digest(uploaded_file, data), "sheets")
+    return _metadata_cache.get_or_create(key, lambda: list_sheets(data))
+
+
+def cache_stats() -> Dict[str, int]:
+    return parse_cache.stats()
+
+
+def clear_cache(key: Optional[str] = None) -> None:
+    if key is None:
+        parse_cache.clear()
+    else:
+        parse_cache.pop(key)
@@ -0,0 +1,352 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from cache import LRUCache
+from cardinality import HIGH_CARDINALITY, get_distinct_counts
+from correlation import get_correlated_pairs
+from duplicates import get_duplicates
+from outliers import get_outlier_stats
+from profiling import DatasetProfile
+
+DEFAULT_BUDGET = 5.0
+
+# Finished rule results, keyed by dataset version, rule parameters and the options the rule reads.
+# Process-wide and bounded, so sessions on the same dataset share them and old datasets age out.
+_results = LRUCache(max_entries=256)
+# Rule runs in progress by result key, so a rerun joins them instead of starting over.
+_running: Dict[Tuple[Any, ...], Future] = {}
+_running_lock = threading.Lock()
+# Last measured run time per rule, used to start (and so show) the cheapest rules first.
+_last_seconds: Dict[str, float] = {}
+
+# Rules run side by side here; their heavy work is numpy, which releases the GIL.
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="dvx-rules")
+
+
+class Insight(NamedTuple):
+    level: str
+    category: str
+    message: str
+    # True when computed on the full dataset rather than the interactive sample.
+    exact: bool = False
+
+
+@dataclass
+class RuleContext:
+    """Everything a rule may read. Rules declare which parts they use; see ``rule()``."""
+
+    dataset_key: str
+    data: pd.DataFrame
+    profile: DatasetProfile
+    full_key: str
+    full_data: pd.DataFrame
+    exact_profile: Optional[DatasetProfile] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def sampled(self) -> bool:
+        return self.full_key != self.dataset_key
+
+    def columns(self, kind: Optional[str]) -> List[Any]:
+        if kind == "numeric":
+            return self.profile.numeric_columns
+        if kind == "categorical":
+            return self.profile.categorical_columns
+        return list(self.profile.columns)
+
+
+@dataclass
+class Rule:
+    name: str
+    # Returns (level, category, message) tuples, optionally with a fourth "exact" flag.
+    func: Callable[..., List[Tuple[Any, ...]]]
+    # Column kind the rule inspects ("numeric", "categorical" or None for all) and how many it needs.
+    columns: Optional[str] = None
+    min_columns: int = 1
+    # Profile statistics the rule reads (ColumnProfile fields), for documentation and the timing table.
+    stats: Tuple[str, ...] = ()
+    # Where its numbers come from: "profile" (exact once the full profile is ready), "full" or "data".
+    source: str = "data"
+    params: Dict[str, Any] = field(default_factory=dict)
+    budget: float = DEFAULT_BUDGET
+    # Keys of ``RuleContext.options`` the rule reads; they are part of its cache key.
+    options: Tuple[str, ...] = ()
+
+
+@dataclass
+class RuleTiming:
+    rule: str
+    status: str
+    seconds: float
+    insights: int
+    detail: str = ""
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def rule(
+    name: str,
+    columns: Optional[str] = None,
+    min_columns: int = 1,
+    stats: Sequence[str] = (),
+    source: str = "data",
+    budget: float = DEFAULT_BUDGET,
+    options: Sequence[str] = (),
+    **params: Any,
+) -> Callable:
+    """Register ``func(ctx, **params)`` as an insight rule; keyword arguments are its default parameters."""
+
+    def register(func: Callable) -> Callable:
+        RULES[name] = Rule(name, func, columns, min_columns, tuple(stats), source, dict(params), budget, tuple(options))
+        return func
+
+    return register
+
+
+def _is_exact(r: Rule, ctx: RuleContext) -> bool:
+    if not ctx.sampled or r.source == "full":
+        return True
+    return r.source == "profile" and ctx.exact_profile is not None
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def result_key(r: Rule, ctx: RuleContext, params: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Cache key for one rule's result: it changes only when the data, thresholds or read options do."""
+    # Rules reading the profile or full data give different (exact) answers once the full profile is ready.
+    exact_ready = ctx.exact_profile is not None if r.source in ("profile", "full") else None
+    read_options = {name: ctx.options.get(name) for name in r.options}
+    return (r.name, ctx.dataset_key, ctx.full_key, exact_ready, _freeze(params), _freeze(read_options))
+
+
+def _timed(r: Rule, ctx: RuleContext, params: Dict[str, Any], key: Tuple[Any, ...]) -> Tuple[List[Insight], float]:
+    start = time.perf_counter()
+    found = r.func(ctx, **params)
+    seconds = time.perf_counter() - start
+    exact = _is_exact(r, ctx)
+    # A rule may mark a single finding as approximate with a fourth element (False).
+    results = [Insight(item[0], item[1], item[2], bool(exact and (len(item) < 4 or item[3]))) for item in found]
+    # Stored from the worker, so a rule finishing after its budget is still ready on the next run.
+    _results.put(key, results)
+    _last_seconds[r.name] = seconds
+    return results, seconds
+
+
+def _finished(key: Tuple[Any, ...]) -> Callable[[Future], None]:
+    def forget(future: Future) -> None:
+        with _running_lock:
+            if _running.get(key) is future:
+                del _running[key]
+
+    return forget
+
+
+def _order(selected: Sequence[Rule]) -> List[Rule]:
+    # Cheapest first by their last measured run; never-timed rules keep registration order up front.
+    return sorted(selected, key=lambda r: _last_seconds.get(r.name, 0.0))
+
+
+def iter_rules(
+    ctx: RuleContext,
+    names: Optional[Sequence[str]] = None,
+    params: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Iterator[Tuple[RuleTiming, List[Insight]]]:
+    """Run the registered rules concurrently and yield each one's result as soon as it is known.
+
+    Skipped and cached rules come first, then the others in completion order, started cheapest
+    first. A rule that overruns its budget is yielded as timed out; its thread carries on and
+    stores the result, which a later run picks up (or waits for, without starting it again).
+    Finished results are reused until the dataset, the rule's parameters or its options change.
+    """
+    params = params or {}
+    selected = _order([RULES[name] for name in (names or RULES)])
+    pending = {}
+    for r in selected:
+        if len(ctx.columns(r.columns)) < r.min_columns:
+            yield RuleTiming(r.name, "skipped", 0.0, 0, f"needs {r.min_columns} {r.columns or ''} column(s)"), []
+            continue
+        merged = {**r.params, **params.get(r.name, {})}
+        key = result_key(r, ctx, merged)
+        cached = _results.get(key)
+        if cached is not None:
+            yield RuleTiming(r.name, "cached", 0.0, len(cached)), cached
+            continue
+        with _running_lock:
+            future = _running.get(key)
+            is_new = future is None
+            if is_new:
+                # Not already running for another session (or an earlier, timed-out run)
+                future = _running[key] = _pool.submit(_timed, r, ctx, merged, key)
+        if is_new:
+            # Outside the lock: a future that is already done runs its callback right here.
+            future.add_done_callback(_finished(key))
+        pending[future] = (r, time.perf_counter())
+
+    while pending:
+        deadline = min(submitted + r.budget for r, submitted in pending.values())
+        done, _ = wait(pending, timeout=max(0.0, deadline - time.perf_counter()), return_when=FIRST_COMPLETED)
+        for future in done:
+            r, submitted = pending.pop(future)
+            try:
+                results, seconds = future.result()
+            except Exception as exc:
+                yield RuleTiming(r.name, "error", time.perf_counter() - submitted, 0, str(exc)), []
+                continue
+            yield RuleTiming(r.name, "ok", seconds, len(results)), results
+        now = time.perf_counter()
+        for future, (r, submitted) in list(pending.items()):
+            if submitted + r.budget <= now and not future.done():
+                del pending[future]
+                yield RuleTiming(r.name, "timed out", r.budget, 0, f"over the {r.budget:.0f}s budget"), []
+
+
+def run_rules(
+    ctx: RuleContext,
+    names: Optional[Sequence[str]] = None,
+    params: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Tuple[List[Insight], List[RuleTiming]]:
+    """All insights and per-rule timings at once; see ``iter_rules``."""
+    insights: List[Insight] = []
+    timings = []
+    for timing, found in iter_rules(ctx, names, params):
+        timings.append(timing)
+        insights.extend(found)
+    return insights, timings
+
+
+def timings_frame(timings: Sequence[RuleTiming]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Rule": [t.rule for t in timings],
+            "Status": [t.status for t in timings],
+            "Time (ms)": [round(t.seconds * 1000, 1) for t in timings],
+            "Insights": [t.insights for t in timings],
+            "Detail": [t.detail for t in timings],
+            "Reads": [", ".join(RULES[t.rule].stats) if t.rule in RULES else "" for t in timings],
+        }
+    )
+
+
+# ---------- BUILT-IN RULES ----------
+
+
+@rule("Missing values", stats=("missing",), source="profile", critical_pct=40.0, warning_pct=15.0)
+def missing_values(ctx: RuleContext, critical_pct: float, warning_pct: float):
+    insights = []
+    prof = ctx.exact_profile or ctx.profile
+    missing_pct = prof.missing_pct.sort_values(ascending=False)
+    for col, pct in missing_pct.items():
+        if pct == 0:
+            continue
+        if pct > critical_pct:
+            level = "Critical"
+            msg = f"{col} has very high missing values ({pct:.1f}%). Consider dropping this column or using advanced imputation."
+        elif pct > warning_pct:
+            level = "Warning"
+            msg = f"{col} has moderate missing values ({pct:.1f}%). Filling with median/most frequent or adding an 'Unknown' category can help."
+        else:
+            level = "Info"
+            msg = f"{col} has some missing values ({pct:.1f}%). Simple imputation (mean/median/mode) should be enough."
+        insights.append((level, "Missing values", msg))
+    return insights  # [web:117][web:120]
+
+
+@rule("Duplicates", source="data", options=("key_columns", "near_duplicates"), warning_pct=10.0)
+def duplicates(ctx: RuleContext, warning_pct: float):
+    insights = []
+    # Row fingerprints: 8 bytes per row whatever the number of columns, counted in one hash pass
+    report = get_duplicates(
+        ctx.dataset_key, ctx.data, ctx.options.get("key_columns"), ctx.options.get("near_duplicates", False)
+    )
+    dup_pct = report.duplicate_pct
+    if dup_pct > 0:
+        scope = f" on {', '.join(map(str, report.columns))}" if report.columns else ""
+        if dup_pct > warning_pct:
+            level = "Warning"
+            msg = f"About {dup_pct:.1f}% of rows are exact duplicates{scope}. Consider removing them before modelling."
+        else:
+            level = "Info"
+            msg = f"About {dup_pct:.1f}% of rows are exact duplicates{scope}. Check whether they are expected."
+        if not report.groups.empty:
+            msg += f" The largest group has {report.groups['rows'].iloc[0]:,} rows."
+        insights.append((level, "Duplicates", msg))
+    if report.near:
+        near_groups = report.groups[report.groups["variants"] > 1]
+        if not near_groups.empty:
+            msg = (
+                f"{len(near_groups)} groups of near-duplicate records differ only slightly "
+                f"(largest: {near_groups['rows'].iloc[0]:,} rows in {near_groups['variants'].iloc[0]} variants)."
+            )
+            insights.append(("Info", "Near duplicates", msg))
+    return insights
+
+
+@rule("Cardinality", columns="categorical", stats=("distinct",), source="full", high=HIGH_CARDINALITY)
+def cardinality(ctx: RuleContext, high: int):
+    insights = []
+    cat_cols = ctx.columns("categorical")
+    if ctx.exact_profile is not None or not ctx.sampled:
+        # Profile counts are exact up to 1M rows and HyperLogLog estimates (with their error) beyond
+        counts = (ctx.exact_profile or ctx.profile).distinct_counts(cat_cols)
+    else:
+        # Count on the full data right away; HyperLogLog stops early once a column is clearly above the threshold
+        counts = get_distinct_counts(ctx.full_key, ctx.full_data, cat_cols, stop_above=high)
+    for col, count in counts.items():
+        nunique = count.value
+        if nunique == 0:
+            continue
+        if nunique > high:
+            level = "Warning"
+            msg = f"{col} has very high cardinality ({count.label()} unique values). Consider grouping or encoding carefully."
+            insights.append((level, "High cardinality", msg, count.exact))
+        elif nunique == 1 and count.complete:
+            level = "Info"
+            estimated = "" if count.exact else " (HyperLogLog estimate)"
+            msg = f"{col} has only one unique value{estimated}. It may not contribute useful information."
+            insights.append((level, "Low variance", msg, count.exact))
+    return insights
+
+
+@rule("Outliers", columns="numeric", source="data", max_pct=20.0)
+def outliers(ctx: RuleContext, max_pct: float):
+    insights = []
+    # All columns at once: exact for small frames, quantile sketches (with an error bound) for large ones
+    stats = get_outlier_stats(ctx.dataset_key, ctx.data, ctx.columns("numeric"))
+    for col, row in stats[stats["outlier_pct"] > max_pct].iterrows():
+        level = "Warning"
+        approx = f" ± {row['error_pct']:.1f}%" if row["error_pct"] else ""
+        msg = f"{col} shows many outliers (~{row['outlier_pct']:.1f}%{approx} of values). Check for data entry errors or consider robust scaling/winsorization."
+        insights.append((level, "Outliers", msg))
+    return insights  # [web:117][web:124]
+
+
+@rule("Correlation", columns="numeric", min_columns=2, source="data", threshold=0.8)
+def correlation(ctx: RuleContext, threshold: float):
+    insights = []
+    # Only pairs above the threshold leave the blocked float32 engine; shared with the heatmap
+    pairs = get_correlated_pairs(ctx.dataset_key, ctx.data, ctx.columns("numeric"), threshold=threshold)  # [web:121][web:125]
+    for col1, col2, corr in pairs.itertuples(index=False):
+        level = "Info"
+        msg = f"{col1} and {col2} are highly correlated (corr ≈ {abs(corr):.2f}). One of them might be redundant."
+        insights.append((level, "High correlation", msg))
+    return insights  # [web:115][web:118]
+
+
+def clear_results() -> None:
+    _results.clear()
+
+
+def result_cache_stats() -> Dict[str, int]:
+    return _results.stats()
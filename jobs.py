@@ -0,0 +1,150 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from cache import LRUCache
+
+# One small pool for the whole process: background work never competes with itself for cores.
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dvx-worker")
+
+# Futures by key, so every session asking for the same result shares one computation.
+_futures = LRUCache(max_entries=32)
+_submit_lock = threading.RLock()
+
+# Jobs with a visible state (ingestion), keyed per session so one user's cancel never stops another's work.
+# Unfinished jobs are held outright and never evicted; finished ones move to a small LRU.
+_active: Dict[Hashable, "Job"] = {}
+_jobs = LRUCache(max_entries=64)
+
+
+def submit(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Run ``fn`` on the background pool."""
+    return _executor.submit(fn, *args, **kwargs)
+
+
+def submit_once(key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Submit ``fn`` unless a job with the same key is already running or finished."""
+    with _submit_lock:
+        future = _futures.get(key)
+        if future is None or future.cancelled() or (future.done() and future.exception() is not None):
+            future = submit(fn, *args, **kwargs)
+            _futures.put(key, future)
+        return future
+
+
+def result_if_ready(key: Hashable) -> Any:
+    """The finished result for ``key``, or None while it is still running (or never started)."""
+    future = _futures.get(key)
+    if future is None or not future.done() or future.cancelled() or future.exception() is not None:
+        return None
+    return future.result()
+
+
+def forget(key: Hashable) -> None:
+    """Drop a remembered job so the next submit_once or start for ``key`` runs it again."""
+    _futures.pop(key)
+    with _submit_lock:
+        _active.pop(key, None)
+        _jobs.pop(key)
+
+
+FINAL_STATES = ("done", "failed", "cancelled")
+
+
+class Cancelled(Exception):
+    """Raised inside a job once its cancel has been requested."""
+
+
+class Job:
+    """A background task with a visible state and cooperative cancellation.
+
+    The task calls ``check()`` (or ``set_state()``/``report()``, which check too) at safe
+    points; a cancel request makes the next check raise ``Cancelled`` and unwinds the work.
+    """
+
+    def __init__(self, key: Hashable) -> None:
+        self.key = key
+        self.state = "queued"
+        self.progress: Any = None
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started = time.time()
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINAL_STATES
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self.started
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            # Never started, so nothing will observe the event.
+            self.state = "cancelled"
+            _retire(self)
+
+    def check(self) -> None:
+        if self.cancel_event.is_set():
+            raise Cancelled()
+
+    def set_state(self, state: str) -> None:
+        self.check()
+        self.state = state
+
+    def report(self, progress: Any) -> None:
+        self.progress = progress
+        self.check()
+
+    def _run(self, fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+        try:
+            self.check()
+            self.state = "running"
+            self.result = fn(self, *args, **kwargs)
+            self.state = "done"
+        except Cancelled:
+            self.state = "cancelled"
+        except Exception as exc:
+            self.error = exc
+            self.state = "failed"
+        finally:
+            _retire(self)
+
+
+def _retire(job: Job) -> None:
+    with _submit_lock:
+        # Only if it is still the job registered for its key (it may have been forgotten).
+        if _active.get(job.key) is job:
+            del _active[job.key]
+            _jobs.put(job.key, job)
+
+
+def supersede(job: Job) -> None:
+    """Cancel a job the caller no longer wants and forget it, so asking for it again starts afresh.
+
+    Unlike a user's cancel, which stays visible as "cancelled" until ``forget``.
+    """
+    job.cancel()
+    forget(job.key)
+
+
+def start(key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Job:
+    """Run ``fn(job, *args, **kwargs)`` in the background unless a job with ``key`` exists.
+
+    Finished, failed and cancelled jobs are returned as they are; ``forget(key)`` to run again.
+    """
+    with _submit_lock:
+        job = _active.get(key) or _jobs.get(key)
+        if job is None:
+            job = _active[key] = Job(key)
+            job.future = submit(job._run, fn, args, kwargs)
+        return job
+
+
+def get_job(key: Hashable) -> Optional[Job]:
+    with _submit_lock:
+        return _active.get(key) or _jobs.get(key)
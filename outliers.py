@@ -0,0 +1,187 @@
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import dataset_store
+
+IQR_FACTOR = 1.5
+# Above this many numeric cells, quartiles come from mergeable sketches built chunk by chunk.
+SKETCH_MIN_CELLS = 20_000_000
+SKETCH_K = 200
+CHUNK_ROWS = 250_000
+# Largest float64 block (rows x columns) materialised at once by the exact path.
+BLOCK_BYTES = 64 * 1024 ** 2
+
+
+class QuantileSketch:
+    """KLL-style quantile sketch: bounded memory, mergeable, fed in batches.
+
+    Level ``h`` holds items of weight ``2 ** h``. A full level is sorted and every other item
+    (from a random offset) is promoted, so rank error stays within ``rank_error`` of ``n``.
+    """
+
+    def __init__(self, k: int = SKETCH_K, seed: Optional[int] = None) -> None:
+        self.k = k
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self) -> float:
+        """Normalised rank error at ~99% confidence (the empirical KLL bound)."""
+        return 2.446 / self.k ** 0.9433
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.n += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item out stays behind so total weight is preserved exactly.
+            keep = items[:1] if len(items) % 2 else items[:0]
+            items = items[len(keep):]
+            promoted = items[int(self._rng.integers(2))::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # New levels shrink the capacity of those below, so recheck from the bottom.
+            level = 0
+
+    def _sorted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype="int64") for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        items, cum = self._sorted()
+        idx = np.searchsorted(cum, np.asarray(qs) * cum[-1], side="left")
+        out = items[np.minimum(idx, len(items) - 1)]
+        return np.clip(out, self.min, self.max)
+
+    def fraction_outside(self, lower: float, upper: float) -> float:
+        """Estimated share of values below ``lower`` or above ``upper``."""
+        if self.n == 0:
+            return 0.0
+        items, cum = self._sorted()
+        total = cum[-1]
+        below = np.searchsorted(items, lower, side="left")
+        at_or_below = np.searchsorted(items, upper, side="right")
+        weight_below = cum[below - 1] if below else 0
+        weight_upto = cum[at_or_below - 1] if at_or_below else 0
+        return float((weight_below + total - weight_upto) / total)
+
+
+def _exact_block(values: np.ndarray) -> pd.DataFrame:
+    # NaN sorts last, so each column's valid values sit at the top of the sorted block.
+    ordered = np.sort(values, axis=0)
+    counts = (~np.isnan(values)).sum(axis=0)
+    rows = []
+    for q in (0.25, 0.75):
+        pos = q * np.maximum(counts - 1, 0)
+        lo = np.floor(pos).astype("int64")
+        hi = np.ceil(pos).astype("int64")
+        low_vals = np.take_along_axis(ordered, lo[None, :], axis=0)[0]
+        high_vals = np.take_along_axis(ordered, hi[None, :], axis=0)[0]
+        rows.append(np.where(counts > 0, low_vals + (high_vals - low_vals) * (pos - lo), np.nan))
+    q1, q3 = rows
+    iqr = q3 - q1
+    lower, upper = q1 - IQR_FACTOR * iqr, q3 + IQR_FACTOR * iqr
+    outside = ((values < lower) | (values > upper)).sum(axis=0)
+    pct = np.where(counts > 0, outside / np.maximum(counts, 1) * 100, 0.0)
+    return pd.DataFrame({"q1": q1, "q3": q3, "lower": lower, "upper": upper, "outlier_pct": pct, "error_pct": 0.0})
+
+
+def _exact(data: pd.DataFrame, columns: List[Any]) -> pd.DataFrame:
+    per_block = max(1, BLOCK_BYTES // max(len(data) * 8, 1))
+    parts = []
+    for start in range(0, len(columns), per_block):
+        block = columns[start:start + per_block]
+        values = data[block].to_numpy(dtype="float64", na_value=np.nan)
+        parts.append(_exact_block(values))
+    return pd.concat(parts, ignore_index=True)
+
+
+def _sketched(data: pd.DataFrame, columns: List[Any], k: int) -> pd.DataFrame:
+    sketches = [QuantileSketch(k, seed=i) for i in range(len(columns))]
+    for start in range(0, len(data), CHUNK_ROWS):
+        chunk = data.iloc[start:start + CHUNK_ROWS][columns].to_numpy(dtype="float64", na_value=np.nan)
+        for j, sketch in enumerate(sketches):
+            sketch.update(chunk[:, j])
+    rows = []
+    for sketch in sketches:
+        q1, q3 = sketch.quantiles([0.25, 0.75])
+        iqr = q3 - q1
+        lower, upper = q1 - IQR_FACTOR * iqr, q3 + IQR_FACTOR * iqr
+        rows.append(
+            {
+                "q1": q1,
+                "q3": q3,
+                "lower": lower,
+                "upper": upper,
+                "outlier_pct": sketch.fraction_outside(lower, upper) * 100,
+                # Each tail's mass is off by at most one rank error.
+                "error_pct": 2 * sketch.rank_error * 100,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def outlier_stats(
+    data: pd.DataFrame,
+    columns: Sequence[Any],
+    sketch_min_cells: int = SKETCH_MIN_CELLS,
+    k: int = SKETCH_K,
+) -> pd.DataFrame:
+    """IQR fences and outlier share for every numeric column, indexed by column.
+
+    Small frames are handled exactly in a few matrix operations; larger ones go through
+    quantile sketches one chunk of rows at a time, with ``error_pct`` giving the bound.
+    """
+    columns = list(columns)
+    if not columns:
+        return pd.DataFrame(columns=["q1", "q3", "lower", "upper", "outlier_pct", "error_pct"])
+    if len(data) * len(columns) >= sketch_min_cells:
+        table = _sketched(data, columns, k)
+    else:
+        table = _exact(data, columns)
+    table.index = pd.Index(columns)
+    return table
+
+
+def get_outlier_stats(dataset_key: str, data: pd.DataFrame, columns: Sequence[Any]) -> pd.DataFrame:
+    """Outlier statistics for a dataset version, computed once and shared while the dataset is held."""
+    return dataset_store.artifact(dataset_key, ("outliers", tuple(columns)), lambda: outlier_stats(data, columns))
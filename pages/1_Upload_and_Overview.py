@@ -4,6 +4,20 @@ import pandas as pd  # [web:46][web:49]
 st.set_page_config(page_title="Upload & Overview – DataVisionX", page_icon="📂", layout="wide")
 
 from header import render_header
+from profiling import get_profile, request_profile
+import dataset_store
+from jobs import forget as forget_job
+from jobs import supersede as supersede_job
+from sampling import DEFAULT_SAMPLE_ROWS, DEFAULT_SEED, badge_html, sample_frame, sample_key
+from ingest import (
+    COLUMNAR_FORMATS,
+    DEFAULT_CHUNK_ROWS,
+    cache_stats,
+    detect_format,
+    start_ingest,
+    upload_columns,
+    upload_sheets,
+)
 render_header()
 
 st.markdown(
@@ -41,30 +55,232 @@ st.markdown(
 )
 
 st.markdown('<div class="section-title">Upload Dataset & Overview</div>', unsafe_allow_html=True)
-st.write("Upload a CSV or Excel file to start automated EDA.")
+st.write("Upload a CSV, Excel, Parquet, Feather or Arrow file to start automated EDA.")
 
 uploaded_file = st.file_uploader(
-    "Choose a CSV or Excel file",
-    type=["csv", "xlsx", "xls"],
-    help="Supported formats: .csv, .xlsx, .xls",  # [web:46]
+    "Choose a data file",
+    type=[
+        "csv", "xlsx", "xls", "parquet", "pq", "feather", "arrow", "ipc", "arrows",
+        "gz", "zip", "bz2", "zst", "xz",
+    ],
+    help=(
+        "Supported formats: .csv, .xlsx, .xls, .parquet, .feather, .arrow/.ipc (Arrow IPC), "
+        "optionally compressed as .gz, .zip, .bz2, .zst or .xz"
+    ),  # [web:46]
 )
 
+with st.expander("Ingestion options"):
+    streaming = st.toggle(
+        "Stream CSV in chunks",
+        value=False,
+        help="Read large CSVs chunk by chunk with live progress and a memory ceiling.",
+    )
+    opt_a, opt_b = st.columns(2)
+    with opt_a:
+        chunk_rows = st.number_input(
+            "Rows per chunk", min_value=1_000, value=DEFAULT_CHUNK_ROWS, step=10_000, disabled=not streaming
+        )
+    with opt_b:
+        max_memory_mb = st.number_input(
+            "Memory ceiling (MB)",
+            min_value=64,
+            value=1024,
+            step=64,
+            disabled=not streaming,
+            help="Rows beyond this budget are scanned for the overview but not kept.",
+        )
+
+    compact = st.toggle(
+        "Compact dtypes after upload",
+        value=False,
+        help="Downcast numbers, store low-cardinality text as category and other text as Arrow strings.",
+    )
+
+    csv_engine = st.selectbox(
+        "CSV parser",
+        ["c", "pyarrow"],
+        format_func=lambda x: {"c": "Default (C)", "pyarrow": "pyarrow (multithreaded)"}[x],
+        help="The pyarrow engine parses on all cores; chunked streaming always uses the default parser.",
+    )
+
+ingest_options = {"streaming": streaming, "compact": compact, "csv_engine": csv_engine}
+if streaming:
+    ingest_options.update(chunk_rows=int(chunk_rows), max_memory_mb=float(max_memory_mb))
+
 if uploaded_file is not None:
-    # Try reading as CSV, then as Excel
     try:
-        df = pd.read_csv(uploaded_file)
-    except Exception:
-        df = pd.read_excel(uploaded_file)  # [web:43][web:49]
+        upload_guess = detect_format(uploaded_file.getvalue(), uploaded_file.name)
+    except ValueError as exc:
+        st.error(str(exc))
+        st.stop()
+    # Sheet and column pickers read the file's own index, which compressed uploads do not expose.
+    upload_format = upload_guess.reader if upload_guess.compression is None else None
+    if upload_format == "excel":
+        # Only the workbook index is read here; the chosen sheet is parsed on its own below.
+        try:
+            sheets = upload_sheets(uploaded_file)
+        except ImportError:
+            st.error("Reading legacy .xls workbooks needs the xlrd package (pip install xlrd).")
+            st.stop()
+        except Exception as exc:
+            st.error(f"Could not read the workbook: {exc}")
+            st.stop()
+        if len(sheets) > 1:
+            ingest_options["sheet"] = st.selectbox("Sheet", sheets)
+        elif sheets:
+            ingest_options["sheet"] = sheets[0]
+        preview_only = st.checkbox("Load a preview only", value=False, help="Parse just the first rows of the sheet.")
+        if preview_only:
+            ingest_options["nrows"] = int(st.number_input("Preview rows", min_value=10, value=1_000, step=100))
 
-    st.session_state["df"] = df
+    if upload_format in COLUMNAR_FORMATS or upload_format == "excel":
+        # Columnar files carry their schema and sheets their header row, so columns can be picked up front.
+        all_columns = upload_columns(uploaded_file, upload_format, ingest_options.get("sheet"))
+        selected_columns = st.multiselect("Columns to load", all_columns, default=all_columns)
+        if selected_columns and len(selected_columns) < len(all_columns):
+            ingest_options["columns"] = tuple(selected_columns)
+
+if uploaded_file is not None:
+    token = st.session_state.setdefault("session_token", dataset_store.SessionToken())
+    # Parsing and profiling run on the background pool, so this script (and every other page) stays responsive.
+    job = start_ingest(uploaded_file, token, **ingest_options)
+    previous = st.session_state.get("ingest_job")
+    if previous is not None and previous is not job and not previous.done:
+        # A different file or new options: the old parse is no longer wanted. Superseded jobs are
+        # forgotten, so switching back to those options starts them again instead of showing "cancelled".
+        supersede_job(previous)
+    st.session_state["ingest_job"] = job
+
+    @st.fragment(run_every=0.5)
+    def ingest_status():
+        if job.done:
+            # Rerun the whole page to render the finished dataset.
+            st.rerun()
+        label = {"queued": "Queued", "running": "Starting", "parsing": "Parsing", "profiling": "Profiling"}
+        p = job.progress
+        if job.state == "parsing" and p is not None:
+            st.progress(p.fraction, text=f"Parsing · {p.fraction:.0%}")
+            st.caption(
+                f"{p.rows:,} rows · {p.bytes_read / 1024 ** 2:.1f} MB read · "
+                f"{p.rows_per_sec:,.0f} rows/s · {p.mb_per_sec:.1f} MB/s"
+            )
+        else:
+            st.info(f"{label.get(job.state, job.state)} {uploaded_file.name} · {job.elapsed:.0f}s")
+        if st.button("Cancel", key="cancel_ingest"):
+            job.cancel()
+            st.rerun()
+
+    if not job.done:
+        ingest_status()
+        st.caption("Other pages keep working on the previously loaded dataset while this runs.")
+        st.stop()
+
+    if job.state != "done":
+        if job.state == "cancelled":
+            st.warning("Ingestion cancelled.")
+        elif isinstance(job.error, (ValueError, pd.errors.ParserError)):
+            st.error(f"Could not read this file: {job.error}")
+        else:
+            st.error(f"Ingestion failed: {job.error}")
+        if st.button("Load again"):
+            forget_job(job.key)
+            st.rerun()
+        st.stop()
+    result = job.result
+    # Memory-mapped from the dataset store and shared with other sessions; treat as read-only.
+    df = dataset_store.load(result.handle)
+    overview = result.overview
+
+    with st.expander("Interactive mode (sampling)"):
+        mode = st.radio(
+            "Work on",
+            ["full", "reservoir", "stratified"],
+            format_func=lambda x: {
+                "full": "Full data",
+                "reservoir": "Random sample",
+                "stratified": "Stratified sample",
+            }[x],
+            horizontal=True,
+            help="Charts and insights use the sample; exact statistics are computed on the full data in the background.",
+        )
+        s_a, s_b, s_c = st.columns(3)
+        with s_a:
+            sample_rows = int(
+                st.number_input(
+                    "Sample rows", min_value=1_000, value=DEFAULT_SAMPLE_ROWS, step=10_000, disabled=mode == "full"
+                )
+            )
+        with s_b:
+            seed = int(st.number_input("Seed", min_value=0, value=DEFAULT_SEED, disabled=mode == "full"))
+        with s_c:
+            strata_col = st.selectbox("Stratify by", df.columns, disabled=mode != "stratified")
+
+    # Sessions hold only store handles; pages map the data back in with dataset_store.load().
+    # The registry shares identical uploads across sessions and frees them with the last one.
+    st.session_state["full_dataset"] = result.handle
+    dataset_store.registry.acquire(token, "full_dataset", result.handle)
+    sampled = mode != "full" and len(df) > sample_rows
+    if sampled:
+        column = strata_col if mode == "stratified" else None
+        st.session_state["dataset"] = dataset_store.get_or_put(
+            sample_key(result.key, mode, sample_rows, seed, column),
+            lambda: sample_frame(df, mode, sample_rows, seed, column),
+        )
+        # Exact full-data profile, shared by every session on this dataset.
+        request_profile(result.key, df)
+        st.markdown(
+            f"{badge_html(False)} Interactive pages use {st.session_state['dataset'].n_rows:,} of {len(df):,} rows. "
+            f"Exact full-data statistics are computed in the background.",
+            unsafe_allow_html=True,
+        )
+    else:
+        st.session_state["dataset"] = result.handle
+    st.session_state["sampled"] = sampled
+    handle = st.session_state["dataset"]
+    dataset_store.registry.acquire(token, "dataset", handle)
+    profile = get_profile(handle.key, dataset_store.load(handle))
+
+    if result.truncated:
+        st.warning(
+            f"Memory ceiling reached: keeping the first {len(df):,} of {overview['n_rows']:,} rows for analysis. "
+            "Overview metrics below cover the whole file."
+        )
+    if ingest_options.get("nrows") is not None and len(df) >= ingest_options["nrows"]:
+        st.warning(
+            f"Preview mode: only the first {ingest_options['nrows']:,} rows of the sheet were loaded. "
+            "Metrics, insights, charts and exports cover these rows only; untick 'Load a preview only' for the full sheet."
+        )
+
+    guess = result.guess
+    if guess is not None:
+        detected = guess.reader.replace("_", " ").upper()
+        if guess.reader == "csv":
+            delimiter = {"\t": "tab", " ": "space"}.get(guess.delimiter, guess.delimiter)
+            detected += (
+                f" · delimiter '{delimiter}' · {guess.encoding} · decimal '{guess.decimal}'"
+                f" · header {'row ' + str(guess.skiprows + 1) if guess.header is not None else 'none'}"
+            )
+        st.caption(f"Detected format: {detected}")
+
+    stats = result.decompression
+    if stats is not None:
+        z1, z2, z3 = st.columns(3)
+        z1.metric(f"Compressed ({stats.codec})", f"{stats.compressed_bytes / 1024 ** 2:.1f} MB")
+        z2.metric(
+            "Uncompressed", f"{stats.uncompressed_bytes / 1024 ** 2:.1f} MB", f"{stats.ratio:.1f}x", delta_color="off"
+        )
+        z3.metric("Decompression", f"{stats.mb_per_sec:.0f} MB/s")
 
     st.write("")
     st.markdown('<div class="section-title">Dataset Snapshot</div>', unsafe_allow_html=True)
     st.dataframe(df.head(), use_container_width=True)
 
-    n_rows, n_cols = df.shape
+    if sampled:
+        st.markdown(f"{badge_html(True)} Overview metrics below cover the full dataset.", unsafe_allow_html=True)
+
+    n_rows, n_cols = overview["n_rows"], overview["n_cols"]
     total_cells = n_rows * n_cols if n_rows and n_cols else 0
-    missing_cells = df.isna().sum().sum()
+    missing_cells = overview["missing_cells"]
     missing_pct = (missing_cells / total_cells * 100) if total_cells else 0
 
     if missing_pct < 5:
@@ -125,14 +341,32 @@ if uploaded_file is not None:
 
     st.write("")
     with st.expander("View column details"):
-        col_info = pd.DataFrame(
-            {
-                "Column": df.columns,
-                "Type": df.dtypes.astype(str),
-                "Missing %": df.isna().mean().values * 100,
-            }
+        col_info = profile.summary_table()
+        # Missing % from ingestion covers every row of the file, even when analysis uses fewer.
+        col_info["Missing %"] = (
+            overview["missing_by_column"].reindex(col_info["Column"]).values / n_rows * 100 if n_rows else 0.0
         )
         st.dataframe(col_info, use_container_width=True)
 
+    if result.memory_report is not None:
+        with st.expander("Memory report (dtype compaction)"):
+            report = result.memory_report
+            before_mb = report["Before (KB)"].sum() / 1024
+            after_mb = report["After (KB)"].sum() / 1024
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Before (MB)", f"{before_mb:.1f}")
+            m2.metric("After (MB)", f"{after_mb:.1f}")
+            m3.metric("Saved", f"{(1 - after_mb / before_mb) * 100 if before_mb else 0:.0f}%")
+            st.dataframe(report, use_container_width=True)
+
+    with st.expander("Cache & sharing"):
+        stats = cache_stats()
+        shared = dataset_store.registry.stats()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Parse cache hits", stats["hits"])
+        c2.metric("Parse cache misses", stats["misses"])
+        c3.metric("Sessions on this dataset", dataset_store.registry.refcount(result.key))
+        c4.metric("Datasets in memory", f"{shared['mapped']} / {shared['datasets']}")
+
 else:
-    st.info("No file uploaded yet. Use the uploader above to select a CSV or Excel file.")
\ No newline at end of file
+    st.info("No file uploaded yet. Use the uploader above to select a data file.")
\ No newline at end of file
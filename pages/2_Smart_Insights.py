@@ -1,6 +1,12 @@
 import streamlit as st
 import pandas as pd  # [web:117][web:120]
 
+import dataset_store
+from duplicates import NEAR_MAX_ROWS, cached_duplicates
+from insights import RULES, RuleContext, iter_rules, timings_frame
+from profiling import cached_profile, get_profile
+from sampling import badge_html
+
 st.set_page_config(
     page_title="Smart Insights – DataVisionX",
     page_icon="💡",
@@ -49,95 +55,143 @@ st.write("Rule‑based recommendations on data quality, structure, and potential
 
 # ---------- CHECK DATA ----------
 
-if "df" not in st.session_state:
+if "dataset" not in st.session_state:
     st.warning("No dataset found. Please upload a file in 'Upload & Overview' first.")
     st.stop()
 
-df: pd.DataFrame = st.session_state["df"]
-
-numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
-categorical_cols = df.select_dtypes(exclude=["int64", "float64"]).columns.tolist()
-
-# ---------- RULE FUNCTIONS ----------
-
-def generate_missing_value_insights(data: pd.DataFrame):
-    insights = []
-    missing_pct = data.isna().mean().sort_values(ascending=False) * 100
-    for col, pct in missing_pct.items():
-        if pct == 0:
-            continue
-        if pct > 40:
-            level = "Critical"
-            msg = f"{col} has very high missing values ({pct:.1f}%). Consider dropping this column or using advanced imputation."
-        elif pct > 15:
-            level = "Warning"
-            msg = f"{col} has moderate missing values ({pct:.1f}%). Filling with median/most frequent or adding an 'Unknown' category can help."
-        else:
-            level = "Info"
-            msg = f"{col} has some missing values ({pct:.1f}%). Simple imputation (mean/median/mode) should be enough."
-        insights.append((level, "Missing values", msg))
-    return insights  # [web:117][web:120]
-
-
-def generate_cardinality_insights(data: pd.DataFrame, cat_cols):
-    insights = []
-    for col in cat_cols:
-        nunique = data[col].nunique(dropna=True)
-        if nunique == 0:
-            continue
-        if nunique > 50:
-            level = "Warning"
-            msg = f"{col} has very high cardinality ({nunique} unique values). Consider grouping or encoding carefully."
-            insights.append((level, "High cardinality", msg))
-        elif nunique == 1:
-            level = "Info"
-            msg = f"{col} has only one unique value. It may not contribute useful information."
-            insights.append((level, "Low variance", msg))
-    return insights
-
-
-def generate_outlier_insights(data: pd.DataFrame, num_cols):
-    insights = []
-    for col in num_cols:
-        series = data[col].dropna()
-        if series.empty:
-            continue
-        q1 = series.quantile(0.25)
-        q3 = series.quantile(0.75)
-        iqr = q3 - q1
-        lower = q1 - 1.5 * iqr
-        upper = q3 + 1.5 * iqr
-        outliers_pct = ((series < lower) | (series > upper)).mean() * 100
-        if outliers_pct > 20:
-            level = "Warning"
-            msg = f"{col} shows many outliers (~{outliers_pct:.1f}% of values). Check for data entry errors or consider robust scaling/winsorization."
-            insights.append((level, "Outliers", msg))
-    return insights  # [web:117][web:124]
-
-
-def generate_correlation_insights(data: pd.DataFrame, num_cols):
-    insights = []
-    if len(num_cols) < 2:
-        return insights
-    corr = data[num_cols].corr().abs()  # [web:121][web:125]
-    # zero diagonal
-    corr.values[range(corr.shape[0]), range(corr.shape[0])] = 0
-    pairs = (
-        corr.where(corr > 0.8)
-        .stack()
-        .reset_index()
-        .rename(columns={"level_0": "col1", "level_1": "col2", 0: "corr"})
+handle = st.session_state["dataset"]
+df: pd.DataFrame = dataset_store.load(handle)
+sampled = st.session_state.get("sampled", False)
+profile = get_profile(handle.key, df)
+# Full-data profile from the background worker, once it is ready
+exact_profile = cached_profile(st.session_state["full_dataset"].key) if sampled else None
+
+# ---------- DUPLICATE SETTINGS ----------
+
+with st.expander("Duplicate detection"):
+    key_cols = st.multiselect(
+        "Key columns",
+        df.columns.tolist(),
+        help="Rows count as duplicates when these columns match. Leave empty to compare whole rows.",
+    )
+    near_dups = st.checkbox(
+        "Also find near-duplicates (MinHash)",
+        value=False,
+        help="Groups records where most fields match once case and surrounding whitespace are normalized.",
+    )
+
+with st.expander("Thresholds"):
+    t1, t2, t3 = st.columns(3)
+    critical_pct = t1.number_input("Missing: critical above (%)", 0.0, 100.0, RULES["Missing values"].params["critical_pct"], 5.0)
+    warning_pct = t1.number_input("Missing: warning above (%)", 0.0, 100.0, RULES["Missing values"].params["warning_pct"], 5.0)
+    high_card = t2.number_input("High cardinality above", 1, 100_000, RULES["Cardinality"].params["high"], 10)
+    outlier_pct = t2.number_input("Outliers: flag above (%)", 0.0, 100.0, RULES["Outliers"].params["max_pct"], 5.0)
+    corr_threshold = t3.slider("Correlation: |corr| above", 0.5, 0.99, RULES["Correlation"].params["threshold"], 0.01)
+
+rule_params = {
+    "Missing values": {"critical_pct": critical_pct, "warning_pct": warning_pct},
+    "Cardinality": {"high": int(high_card)},
+    "Outliers": {"max_pct": outlier_pct},
+    "Correlation": {"threshold": corr_threshold},
+}
+
+# ---------- RUN RULES ----------
+
+# Rules live in insights.py (or any module using @insights.rule) and run concurrently, each within a time budget
+full_handle = st.session_state["full_dataset"]
+context = RuleContext(
+    dataset_key=handle.key,
+    data=df,
+    profile=profile,
+    full_key=full_handle.key,
+    full_data=dataset_store.load(full_handle),
+    exact_profile=exact_profile,
+    options={"key_columns": key_cols, "near_duplicates": near_dups},
+)
+
+LEVEL_COLORS = {"Critical": "#f97316", "Warning": "#eab308", "Info": "#38bdf8"}
+LEVEL_ORDER = {"Critical": 0, "Warning": 1, "Info": 2}
+
+
+def render_summary(items):
+    col_a, col_b, col_c = summary_slot.container().columns(3)
+    col_a.metric("Critical", sum(1 for item in items if item.level == "Critical"))
+    col_b.metric("Warnings", sum(1 for item in items if item.level == "Warning"))
+    col_c.metric("Info", sum(1 for item in items if item.level == "Info"))
+
+
+def render_cards(items):
+    with cards_slot.container():
+        for level, category, msg, exact in sorted(items, key=lambda x: LEVEL_ORDER.get(x.level, 3)):
+            st.markdown(
+                f"""
+                <div class="card">
+                    <span class="pill-badge" style="background:{LEVEL_COLORS.get(level, '#94a3b8')};">{level}</span>
+                    <strong>{category}</strong>
+                    {badge_html(exact) if sampled else ""}
+                    <p style="margin:0.4rem 0 0 0;">{msg}</p>
+                </div>
+                """,
+                unsafe_allow_html=True,
+            )
+            st.write("")
+
+
+# ---------- SUMMARY ----------
+
+summary_slot = st.empty()
+
+if sampled:
+    st.markdown(
+        f"Insights marked {badge_html(False)} are computed on a {len(df):,}-row sample; "
+        f"{badge_html(True)} ones use the full dataset.",
+        unsafe_allow_html=True,
+    )
+    if exact_profile is None:
+        st.caption("Exact statistics are still being computed in the background. Rerun the page to pick them up.")
+
+st.write("")
+
+# ---------- INSIGHT CARDS ----------
+
+# Cards appear as each rule finishes (cheapest first); the bar tracks the rules still running
+progress_slot = st.empty()
+cards_slot = st.empty()
+all_insights, rule_timings = [], []
+render_summary(all_insights)
+# Results are cached per dataset version and thresholds, so reruns only redo rules whose inputs changed
+for timing, found in iter_rules(context, params=rule_params):
+    rule_timings.append(timing)
+    remaining = [name for name in RULES if name not in {t.rule for t in rule_timings}]
+    if remaining:
+        progress_slot.progress(len(rule_timings) / len(RULES), text=f"Running: {', '.join(remaining)}")
+    else:
+        progress_slot.empty()
+    if found:
+        all_insights.extend(found)
+        render_summary(all_insights)
+        render_cards(all_insights)
+
+if not all_insights:
+    cards_slot.success("No issues detected. Your dataset looks clean based on the current rules.")
+
+# Read back, never recomputed here: the duplicates rule may still be running past its budget
+duplicate_report = cached_duplicates(handle.key, key_cols, near_dups)
+
+timed_out = [t.rule for t in rule_timings if t.status == "timed out"]
+if timed_out:
+    st.caption(
+        f"Still running past their time budget: {', '.join(timed_out)}. "
+        "Their results are cached when done; rerun the page to include them."
     )
-    for _, row in pairs.iterrows():
-        level = "Info"
-        msg = f"{row['col1']} and {row['col2']} are highly correlated (corr ≈ {row['corr']:.2f}). One of them might be redundant."
-        insights.append((level, "High correlation", msg))
-    return insights  # [web:115][web:118]
-
-
-def generate_duplicate_insights(data: pd.DataFrame):
-    dup_pct = data.duplicated().mean() * 100
-    if dup_pct == 0:
-        return []
-    if dup_pct > 10:
-        level
\ No newline at end of file
+
+with st.expander("Rule timings"):
+    st.dataframe(timings_frame(rule_timings), use_container_width=True)
+
+# ---------- DUPLICATE GROUPS ----------
+
+if duplicate_report is not None and not duplicate_report.groups.empty:
+    st.markdown('<div class="section-title">Top duplicate groups</div>', unsafe_allow_html=True)
+    if duplicate_report.near_truncated:
+        st.caption(f"Near-duplicate search covered the first {NEAR_MAX_ROWS:,} distinct rows.")
+    st.dataframe(duplicate_report.group_rows(df), use_container_width=True)
@@ -1,8 +1,19 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
 import seaborn as sns  # [web:17][web:64]
 
+import dataset_store
+from correlation import correlation_matrix, get_correlation_matrix
+from datetimes import date_columns
+from density import DENSITY_MIN_POINTS, density_grid
+from downsample import downsample, points_caption
+from filters import Condition, apply_conditions, filter_values, select_rows
+from profiling import get_profile
+from sampling import badge_html
+
 st.set_page_config(page_title="Visual Explorer – DataVisionX", page_icon="📊", layout="wide")
 
 st.markdown(
@@ -36,19 +47,35 @@ st.markdown(
 st.markdown('<div class="section-title">Visual Explorer</div>', unsafe_allow_html=True)
 st.write("Create interactive charts by choosing columns and chart type.")
 
-if "df" not in st.session_state:
+if "dataset" not in st.session_state:
     st.warning("No dataset found. Please upload a file in 'Upload & Overview' first.")
     st.stop()
 
-df: pd.DataFrame = st.session_state["df"]
+handle = st.session_state["dataset"]
+df: pd.DataFrame = dataset_store.load(handle)
+
+if st.session_state.get("sampled"):
+    st.markdown(
+        f"{badge_html(False)} Charts use a {len(df):,}-row sample of the dataset.",
+        unsafe_allow_html=True,
+    )
 
-numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
-categorical_cols = df.select_dtypes(exclude=["int64", "float64"]).columns.tolist()
+profile = get_profile(handle.key, df)
+numeric_cols = profile.numeric_columns
+categorical_cols = profile.categorical_columns
 
 with st.expander("Column summary", expanded=False):
     st.write("Numeric columns:", numeric_cols)
     st.write("Categorical columns:", categorical_cols)
 
+OPERATOR_LABELS = {
+    "range": "in range",
+    "values": "is one of",
+    "is_null": "is missing",
+    "not_null": "is not missing",
+    "contains": "contains text",
+}
+
 controls_col, chart_col = st.columns([0.9, 2])
 
 with controls_col:
@@ -79,37 +106,91 @@ with controls_col:
             if y_col == "(none)":
                 y_col = None
 
-    st.markdown('<div class="hint-text">Optional filters</div>', unsafe_allow_html=True)
+    density_min_points = DENSITY_MIN_POINTS
+    if chart_type == "Scatter":
+        density_min_points = st.number_input(
+            "Density view above (points)",
+            min_value=1_000,
+            value=DENSITY_MIN_POINTS,
+            step=50_000,
+            help="Larger scatter plots are drawn as a 2D density image instead of individual points.",
+        )
 
-    filter_col = st.selectbox(
-        "Filter by column (optional)",
-        options=["(none)"] + df.columns.tolist(),
-        index=0,
-    )
+    corr_missing = "pairwise"
+    if chart_type == "Correlation heatmap":
+        corr_missing = st.selectbox(
+            "Missing values",
+            ["pairwise", "complete", "mean"],
+            format_func=lambda x: {
+                "pairwise": "Pairwise complete rows",
+                "complete": "Rows complete in every column",
+                "mean": "Fill with column mean",
+            }[x],
+        )
+
+    st.markdown('<div class="hint-text">Optional filters</div>', unsafe_allow_html=True)
 
-    filtered_df = df.copy()
-    if filter_col != "(none)":
-        if pd.api.types.is_numeric_dtype(df[filter_col]):
-            min_val, max_val = float(df[filter_col].min()), float(df[filter_col].max())
-            selected_range = st.slider(
-                f"Select range for {filter_col}",
-                min_val,
-                max_val,
-                (min_val, max_val),
+    # Any number of stacked conditions (AND); each row holds its own widgets
+    if "explorer_filters" not in st.session_state:
+        st.session_state["explorer_filters"] = []
+    filter_ids = st.session_state["explorer_filters"]
+    conditions = []
+    for fid in list(filter_ids):
+        col_a, col_b, col_c = st.columns([1.2, 1, 0.3])
+        column = col_a.selectbox("Column", df.columns.tolist(), key=f"filter_col_{fid}")
+        col_profile = profile.columns[column]
+        numeric = col_profile.inferred_type == "numeric"
+        ops = ["range" if numeric else "values", "is_null", "not_null"] + ([] if numeric else ["contains"])
+        op = col_b.selectbox("Condition", ops, format_func=OPERATOR_LABELS.get, key=f"filter_op_{fid}")
+        if col_c.button("✕", key=f"filter_remove_{fid}", help="Remove this condition"):
+            filter_ids.remove(fid)
+            st.rerun()
+        if op == "range":
+            low, high = st.slider(
+                f"Range for {column}",
+                col_profile.min,
+                col_profile.max,
+                (col_profile.min, col_profile.max),
+                key=f"filter_range_{fid}",
             )
-            filtered_df = filtered_df[
-                (filtered_df[filter_col] >= selected_range[0])
-                & (filtered_df[filter_col] <= selected_range[1])
-            ]
-        else:
-            unique_vals = sorted(df[filter_col].dropna().unique().tolist())
+            if (low, high) != (col_profile.min, col_profile.max) or col_profile.missing:
+                conditions.append(Condition(column, op, (low, high)))
+        elif op == "values":
+            unique_vals = filter_values(handle.key, df, column)
             selected_vals = st.multiselect(
-                f"Select values for {filter_col}",
-                options=unique_vals,
-                default=unique_vals,
+                f"Values for {column}", options=unique_vals, default=unique_vals, key=f"filter_values_{fid}"
             )
-            if selected_vals:
-                filtered_df = filtered_df[filtered_df[filter_col].isin(selected_vals)]
+            if selected_vals and (len(selected_vals) < len(unique_vals) or col_profile.missing):
+                conditions.append(Condition(column, op, tuple(selected_vals)))
+        elif op == "contains":
+            text = st.text_input(f"Text in {column}", key=f"filter_text_{fid}")
+            if text:
+                conditions.append(Condition(column, op, (text,)))
+        else:
+            conditions.append(Condition(column, op))
+
+    if st.button("＋ Add filter"):
+        filter_ids.append(max(filter_ids, default=-1) + 1)
+        st.rerun()
+
+    # Conditions run most selective first over cached column indexes; the source data is never copied
+    row_mask = None
+    if conditions:
+        filter_result = apply_conditions(handle.key, df, conditions)
+        row_mask = filter_result.mask
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "Condition": [cond.label() for cond, _ in filter_result.steps],
+                    "Rows left": [rows for _, rows in filter_result.steps],
+                }
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+    # Only the charted columns of the kept rows are materialised
+    filtered_df = select_rows(df, row_mask, [x_col, y_col])
 
     st.markdown(
         '<p class="hint-text">Tip: Use filters to drill down into specific segments of your data.</p>',
@@ -161,6 +242,54 @@ with chart_col:
                 and pd.api.types.is_numeric_dtype(filtered_df[y_col])
             ):
                 st.error("Scatter plot requires numeric X and Y columns.")
+            elif len(filtered_df) > density_min_points:
+                # Binned server-side into a fixed grid, so drawing time no longer grows with the row count
+                counts, extent = density_grid(filtered_df[x_col], filtered_df[y_col])
+                image = ax.imshow(
+                    np.ma.masked_equal(counts, 0),
+                    origin="lower",
+                    extent=extent,
+                    aspect="auto",
+                    cmap="viridis",
+                    norm=LogNorm(vmin=1, vmax=max(int(counts.max()), 2)),
+                    interpolation="nearest",
+                )
+                fig.colorbar(image, ax=ax, label="Points per cell")
+                ax.set_title(f"{y_col} vs {x_col} (density of {len(filtered_df):,} points)")
+                ax.set_xlabel(x_col)
+                ax.set_ylabel(y_col)
             else:
                 sns.scatterplot(data=filtered_df, x=x_col, y=y_col, ax=ax, color="#22c55e")  # [web:58][web:64]
-                ax
\ No newline at end of file
+                ax.set_title(f"{y_col} vs {x_col}")
+        elif chart_type == "Line":
+            if y_col is None or not pd.api.types.is_numeric_dtype(filtered_df[y_col]):
+                st.error("Line chart requires a numeric Y column.")
+            else:
+                # Date-like text columns are plotted on a time axis, parsed once per dataset
+                dates = date_columns(handle.key, df).series
+                x_values = filtered_df[x_col]
+                if x_col in dates:
+                    x_values = dates[x_col] if row_mask is None else dates[x_col][row_mask]
+                line_df = pd.DataFrame({x_col: x_values, y_col: filtered_df[y_col]}).dropna().sort_values(by=x_col)
+                # Shape-preserving downsampling: matplotlib draws a bounded number of points
+                line_x, line_y = downsample(line_df[x_col], line_df[y_col])
+                ax.plot(line_x, line_y, color="#38bdf8")
+                st.caption(points_caption(len(line_df), len(line_x)))
+                ax.set_title(f"{y_col} over {x_col}")
+                ax.set_xlabel(x_col)
+                ax.set_ylabel(y_col)
+                plt.xticks(rotation=45)
+        elif chart_type == "Correlation heatmap":
+            num_cols = numeric_cols
+            if len(num_cols) < 2:
+                st.error("Correlation heatmap needs at least two numeric columns.")
+            else:
+                if row_mask is None:
+                    # Same cached matrix the Smart Insights correlation rule reads its pairs from
+                    corr = get_correlation_matrix(handle.key, df, num_cols, corr_missing)
+                else:
+                    corr = correlation_matrix(df, num_cols, corr_missing, rows=row_mask)
+                sns.heatmap(corr, annot=len(num_cols) <= 12, fmt=".2f", cmap="coolwarm", ax=ax)  # [web:64]
+                ax.set_title("Correlation heatmap")
+
+        st.pyplot(fig)
@@ -7,6 +7,12 @@ try:
 except Exception:
     alt = None
 
+import dataset_store
+from datetimes import date_columns
+from downsample import downsample, points_caption
+from profiling import get_profile
+from sampling import badge_html
+
 st.set_page_config(page_title="Time Series – DataVisionX", page_icon="⏱", layout="wide")
 
 st.markdown(
@@ -30,36 +36,33 @@ st.markdown(
 st.markdown('<div class="section-title">Time Series Explorer</div>', unsafe_allow_html=True)
 st.write("Analyze trends, seasonality, and moving averages for date‑based data.")
 
-if "df" not in st.session_state:
+if "dataset" not in st.session_state:
     st.warning("No dataset found. Please upload a file in 'Upload & Overview' first.")
     st.stop()
 
-df: pd.DataFrame = st.session_state["df"].copy()
+handle = st.session_state["dataset"]
+# Memory-mapped from the dataset store and shared with other sessions; treat as read-only.
+df: pd.DataFrame = dataset_store.load(handle)
 
-# Detect potential datetime columns
-auto_date_cols = [
-    c for c in df.columns
-    if pd.api.types.is_datetime64_any_dtype(df[c])
-]
+if st.session_state.get("sampled"):
+    st.markdown(
+        f"{badge_html(False)} Charts use a {len(df):,}-row sample of the dataset.",
+        unsafe_allow_html=True,
+    )
 
-if not auto_date_cols:
-    # Try to parse any column that looks like date
-    for c in df.columns:
-        try:
-            parsed = pd.to_datetime(df[c])
-            df[c] = parsed
-            auto_date_cols.append(c)
-        except Exception:
-            continue
+# Detected once per dataset from a small sample of each column, then parsed with an explicit format
+dates = date_columns(handle.key, df)
+auto_date_cols = dates.names
 
 if not auto_date_cols:
     st.error("No suitable date/time column detected. Please ensure your dataset has a date column.")
     st.stop()
 
 date_col = st.selectbox("Select date column", auto_date_cols)
-df = df.sort_values(by=date_col)
+if dates.formats[date_col]:
+    st.caption(f"Parsed from text with format `{dates.formats[date_col]}`")
 
-numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
+numeric_cols = get_profile(handle.key, df).numeric_columns
 if not numeric_cols:
     st.error("No numeric columns available for time‑series analysis.")
     st.stop()
@@ -74,25 +77,32 @@ freq = st.selectbox(
 
 window = st.slider("Moving average window (periods)", 1, 60, 7)
 
-df_ts = df[[date_col, value_col]].dropna()
-df_ts = df_ts.set_index(date_col).resample(freq).mean()  # [web:74]
+# Only the two selected columns are used; resample orders by date itself
+df_ts = pd.DataFrame({value_col: df[value_col]}).set_index(dates.series[date_col].rename(date_col))
+df_ts = df_ts[df_ts.index.notna()].dropna().resample(freq).mean()  # [web:74]
 
 if alt is not None:
     try:
         df_plot = df_ts.reset_index().rename(columns={date_col: 'date'})
-        df_plot['rolling'] = df_plot[value_col].rolling(window).mean()
+        # Rolling mean on every period first, then each line is downsampled on its own
+        rolling = df_plot[value_col].rolling(window).mean()
+        observed = df_plot[value_col].notna()
+        actual_x, actual_y = downsample(df_plot['date'][observed], df_plot[value_col][observed])
+        df_actual = pd.DataFrame({'date': actual_x, value_col: actual_y})
+        rolling_x, rolling_y = downsample(df_plot['date'][rolling.notna()], rolling.dropna())
+        df_rolling = pd.DataFrame({'date': rolling_x, 'rolling': rolling_y})
 
         # Create interactive selection for hover effects
         hover = alt.selection_single(on='mouseover', empty='none', nearest=True)
 
-        chart_actual = alt.Chart(df_plot).mark_line(color='#4f46e5', size=2.5, point=alt.OverlayMarkDef(filled=True, size=50)).encode(
+        chart_actual = alt.Chart(df_actual).mark_line(color='#4f46e5', size=2.5, point=alt.OverlayMarkDef(filled=True, size=50)).encode(
             x=alt.X('date:T', title='Date'),
             y=alt.Y(f'{value_col}:Q', title=value_col),
             tooltip=['date:T', f'{value_col}:Q'],
             opacity=alt.condition(hover, alt.value(1), alt.value(0.7))
         ).add_selection(hover)
 
-        chart_ma = alt.Chart(df_plot).mark_line(color='#ff4b9f', size=2.5, strokeDash=[5, 5]).encode(
+        chart_ma = alt.Chart(df_rolling).mark_line(color='#ff4b9f', size=2.5, strokeDash=[5, 5]).encode(
             x='date:T',
             y=alt.Y('rolling:Q', title=f'Rolling mean ({window})'),
             tooltip=['date:T', alt.Tooltip('rolling:Q', format='.2f')],
@@ -105,6 +115,7 @@ if alt is not None:
         lower = combined.encode(opacity=alt.condition(brush, alt.value(1), alt.value(0.3))).properties(height=360)
 
         st.altair_chart(alt.vconcat(lower, upper), use_container_width=True)
+        st.caption(points_caption(int(observed.sum()), len(df_actual)))
     except Exception:
         alt = None
 
@@ -114,8 +125,13 @@ if alt is None:
     fig.patch.set_facecolor("#05061a")
     ax.set_facecolor("#05061a")
 
-    ax.plot(df_ts.index, df_ts[value_col], label="Actual", color="#4f46e5")
-    ax.plot(df_ts.index, df_ts[value_col].rolling(window).mean(), label=f"Rolling mean ({window})", color="#ff4b9f")
+    # Rolling mean over calendar periods, as in the Altair chart; gaps are dropped only for drawing
+    rolling = df_ts[value_col].rolling(window).mean().dropna()
+    series = df_ts[value_col].dropna()
+    actual_x, actual_y = downsample(series.index.to_series(), series)
+    rolling_x, rolling_y = downsample(rolling.index.to_series(), rolling)
+    ax.plot(actual_x, actual_y, label="Actual", color="#4f46e5")
+    ax.plot(rolling_x, rolling_y, label=f"Rolling mean ({window})", color="#ff4b9f")
 
     ax.set_title(f"{value_col} over time ({freq})")
     ax.set_xlabel("Date")
@@ -123,6 +139,7 @@ if alt is None:
     ax.legend()
 
     st.pyplot(fig)  # [web:25][web:23]
+    st.caption(points_caption(len(series), len(actual_x)))
 
 st.write("")
 
@@ -2,6 +2,11 @@ import streamlit as st
 import pandas as pd
 import io  # [web:73][web:87]
 
+import dataset_store
+from cardinality import HIGH_CARDINALITY, get_distinct_counts
+from profiling import cached_profile, get_profile
+from sampling import badge_html
+
 st.set_page_config(page_title="Report & Export – DataVisionX", page_icon="📑", layout="wide")
 
 st.markdown(
@@ -31,14 +36,19 @@ st.markdown(
 st.markdown('<div class="section-title">Report & Export</div>', unsafe_allow_html=True)
 st.write("Download a summary report and the cleaned dataset for further use.")
 
-if "df" not in st.session_state:
+if "dataset" not in st.session_state:
     st.warning("No dataset found. Please upload a file in 'Upload & Overview' first.")
     st.stop()
 
-df: pd.DataFrame = st.session_state["df"].copy()
+# Exports always use the full dataset, even when the interactive pages work on a sample
+full_handle = st.session_state.get("full_dataset", st.session_state["dataset"])
+df: pd.DataFrame = dataset_store.load(full_handle)
+sampled = st.session_state.get("sampled", False)
+full_key = full_handle.key
 
 st.subheader("Cleaned dataset preview")
-clean_df = df.dropna(how="all")  # simple cleaning rule
+empty_rows = df.isna().all(axis=1)
+clean_df = df[~empty_rows] if empty_rows.any() else df  # simple cleaning rule; no copy when nothing is dropped
 st.dataframe(clean_df.head(), use_container_width=True)  # [web:73]
 
 st.write("")
@@ -60,8 +70,16 @@ st.markdown("### Generate HTML summary report")
 
 if st.button("Create HTML Report"):
     with st.spinner("Generating summary report..."):
-        numeric_cols = clean_df.select_dtypes(include=["number"]).columns.tolist()
-        categorical_cols = clean_df.select_dtypes(exclude=["number"]).columns.tolist()
+        profile = cached_profile(full_key) if sampled else get_profile(full_key, df)
+        if profile is None:
+            # The full-data profile is still being computed; summarise the interactive sample meanwhile.
+            handle = st.session_state["dataset"]
+            profile = get_profile(handle.key, dataset_store.load(handle))
+            stats_label = f"sampled, {profile.n_rows:,} of {len(df):,} rows"
+        else:
+            stats_label = "exact"
+        describe = profile.describe()
+        categorical_cols = profile.categorical_columns
 
         lines = []
         lines.append("DataVisionX Summary Report")
@@ -71,22 +89,33 @@ if st.button("Create HTML Report"):
         lines.append("Column types:")
         lines.append(clean_df.dtypes.astype(str).to_string())
         lines.append("")
-        lines.append("Missing values (%) per column:")
-        mv = (clean_df.isna().mean() * 100).round(2).sort_values(ascending=False)
+        lines.append(f"Missing values (%) per column [{stats_label}]:")
+        mv = profile.missing_pct.round(2).sort_values(ascending=False)
         lines.append(mv.to_string())
 
-        if numeric_cols:
+        if describe is not None:
             lines.append("")
-            lines.append("Numeric summary (describe):")
-            lines.append(clean_df[numeric_cols].describe().to_string())
+            lines.append(f"Numeric summary (describe) [{stats_label}]:")
+            lines.append(describe.to_string())
 
         if categorical_cols:
+            if stats_label == "exact":
+                counts = profile.distinct_counts(categorical_cols)
+                counts_label = "exact" if all(count.exact for count in counts.values()) else "full data, HyperLogLog beyond 1M rows"
+            else:
+                # Same full-data estimates as the cardinality insights, with their error bounds.
+                counts = get_distinct_counts(full_key, df, categorical_cols, stop_above=HIGH_CARDINALITY)
+                counts_label = "full data, HyperLogLog beyond 1M rows"
             lines.append("")
-            lines.append("Categorical columns (unique counts):")
-            lines.append(clean_df[categorical_cols].nunique().to_string())
+            lines.append(f"Categorical columns (unique counts) [{counts_label}]:")
+            lines.append(pd.Series({col: count.label() for col, count in counts.items()}, dtype="object").to_string())
 
         report_text = "\n\n".join(lines)
 
+        st.markdown(
+            f"{badge_html(stats_label == 'exact')} Statistics in this report are {stats_label}.",
+            unsafe_allow_html=True,
+        )
         st.text_area("Report preview", value=report_text, height=400)
 
         st.download_button(
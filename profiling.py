@@ -0,0 +1,223 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import dataset_store
+import jobs
+from cardinality import DistinctCount, distinct_count
+
+QUANTILES = (0.25, 0.5, 0.75)
+# Text columns with at most this share of distinct values are reported as categorical.
+CATEGORICAL_MAX_RATIO = 0.5
+INFER_SAMPLE = 1_000
+
+
+@dataclass
+class ColumnProfile:
+    name: Any
+    dtype: str
+    inferred_type: str
+    count: int
+    missing: int
+    distinct: int
+    # Relative error of ``distinct`` (HyperLogLog on large columns); 0 when it is exact.
+    distinct_error: float = 0.0
+    min: Any = None
+    max: Any = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    skew: Optional[float] = None
+    kurtosis: Optional[float] = None
+    quantiles: Dict[float, float] = field(default_factory=dict)
+
+    @property
+    def missing_pct(self) -> float:
+        total = self.count + self.missing
+        return self.missing / total * 100 if total else 0.0
+
+
+@dataclass
+class DatasetProfile:
+    """Per-column statistics for one dataset version, computed once and shared by every page."""
+
+    n_rows: int
+    columns: Dict[Any, ColumnProfile]
+
+    @property
+    def n_cols(self) -> int:
+        return len(self.columns)
+
+    @property
+    def numeric_columns(self) -> List[Any]:
+        return [name for name, col in self.columns.items() if col.inferred_type == "numeric"]
+
+    @property
+    def categorical_columns(self) -> List[Any]:
+        return [name for name, col in self.columns.items() if col.inferred_type != "numeric"]
+
+    @property
+    def missing_cells(self) -> int:
+        return sum(col.missing for col in self.columns.values())
+
+    @property
+    def missing_pct(self) -> pd.Series:
+        return pd.Series({name: col.missing_pct for name, col in self.columns.items()}, dtype="float64")
+
+    @property
+    def dtypes(self) -> pd.Series:
+        return pd.Series({name: col.dtype for name, col in self.columns.items()}, dtype="object")
+
+    def distinct_counts(self, columns: Optional[List[Any]] = None) -> Dict[Any, DistinctCount]:
+        names = self.columns if columns is None else columns
+        return {
+            name: DistinctCount(self.columns[name].distinct, self.columns[name].distinct_error) for name in names
+        }
+
+    def nunique(self, columns: Optional[List[Any]] = None) -> pd.Series:
+        names = self.columns if columns is None else columns
+        return pd.Series({name: self.columns[name].distinct for name in names}, dtype="int64")
+
+    def describe(self) -> Optional[pd.DataFrame]:
+        """Same layout as ``DataFrame.describe()`` over the numeric columns."""
+        names = self.numeric_columns
+        if not names:
+            return None
+        rows = {}
+        for name in names:
+            col = self.columns[name]
+            q = col.quantiles
+            rows[name] = [
+                col.count, col.mean, col.std, col.min, q.get(0.25), q.get(0.5), q.get(0.75), col.max
+            ]
+        index = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+        return pd.DataFrame(rows, index=index, dtype="float64")
+
+    def summary_table(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "Column": list(self.columns),
+                "Type": [col.dtype for col in self.columns.values()],
+                "Inferred": [col.inferred_type for col in self.columns.values()],
+                "Missing %": [col.missing_pct for col in self.columns.values()],
+                "Distinct": [col.distinct for col in self.columns.values()],
+            }
+        )
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+
+
+def _moments(values: np.ndarray) -> Dict[str, Optional[float]]:
+    # Sample std, and skew/kurtosis with the same bias corrections pandas uses.
+    n = values.size
+    out: Dict[str, Optional[float]] = {"mean": None, "std": None, "skew": None, "kurtosis": None}
+    if n == 0:
+        return out
+    mean = float(values.mean())
+    out["mean"] = mean
+    if n < 2:
+        return out
+    dev = values - mean
+    m2 = float(np.dot(dev, dev)) / n
+    out["std"] = float(np.sqrt(m2 * n / (n - 1)))
+    if m2 == 0:
+        out["skew"] = 0.0 if n >= 3 else None
+        out["kurtosis"] = 0.0 if n >= 4 else None
+        return out
+    dev2 = dev * dev
+    m3 = float(np.dot(dev2, dev)) / n
+    m4 = float(np.dot(dev2, dev2)) / n
+    if n >= 3:
+        out["skew"] = np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2 ** 1.5
+    if n >= 4:
+        g2 = m4 / m2 ** 2 - 3
+        out["kurtosis"] = (n - 1) / ((n - 2) * (n - 3)) * ((n + 1) * g2 + 6)
+    return out
+
+
+def _infer_text_type(series: pd.Series, distinct: int, count: int) -> str:
+    sample = series.dropna().head(INFER_SAMPLE)
+    kind = pd.api.types.infer_dtype(sample, skipna=True)
+    if kind in ("datetime", "datetime64", "date"):
+        return "datetime"
+    if kind in ("string", "categorical") or isinstance(series.dtype, pd.CategoricalDtype):
+        return "categorical" if count and distinct <= CATEGORICAL_MAX_RATIO * count else "text"
+    if kind == "boolean":
+        return "boolean"
+    return "mixed"
+
+
+def profile_column(series: pd.Series) -> ColumnProfile:
+    """All statistics for one column from a single read of its values."""
+    missing_mask = series.isna().to_numpy()
+    missing = int(missing_mask.sum())
+    count = len(series) - missing
+    base = {"name": series.name, "dtype": str(series.dtype), "count": count, "missing": missing}
+
+    if count == 0:
+        return ColumnProfile(inferred_type="empty", distinct=0, **base)
+
+    # Exact up to cardinality.EXACT_MAX_ROWS, HyperLogLog beyond, so huge ID columns stay cheap
+    counted = distinct_count(series)
+    distinct = counted.value
+    base["distinct_error"] = counted.error
+
+    if _is_numeric(series):
+        values = series.to_numpy(dtype="float64", na_value=np.nan)[~missing_mask]
+        qs = np.quantile(values, QUANTILES)
+        return ColumnProfile(
+            inferred_type="numeric",
+            distinct=distinct,
+            min=float(values.min()),
+            max=float(values.max()),
+            quantiles=dict(zip(QUANTILES, map(float, qs))),
+            **_moments(values),
+            **base,
+        )
+
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return ColumnProfile(inferred_type="boolean", distinct=distinct, **base)
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return ColumnProfile(inferred_type="datetime", distinct=distinct, min=series.min(), max=series.max(), **base)
+    return ColumnProfile(inferred_type=_infer_text_type(series, distinct, count), distinct=distinct, **base)
+
+
+def profile_frame(df: pd.DataFrame, check: Optional[Callable[[], None]] = None) -> DatasetProfile:
+    """Profile every column of a frame in one pass over the data.
+
+    ``check`` is called before each column and may raise to abandon the profile.
+    """
+    columns = {}
+    for i, name in enumerate(df.columns):
+        if check is not None:
+            check()
+        columns[name] = profile_column(df.iloc[:, i])
+    return DatasetProfile(n_rows=len(df), columns=columns)
+
+
+def get_profile(
+    dataset_key: str, df: pd.DataFrame, check: Optional[Callable[[], None]] = None
+) -> DatasetProfile:
+    """Profile for a dataset version, computed on first use and shared while the dataset is held."""
+    return dataset_store.artifact(dataset_key, "profile", lambda: profile_frame(df, check))
+
+
+def cached_profile(dataset_key: Optional[str]) -> Optional[DatasetProfile]:
+    """Profile for a dataset version if it has already been computed, else None."""
+    if dataset_key is None:
+        return None
+    return dataset_store.registry.peek_artifact(dataset_key, "profile")
+
+
+def request_profile(dataset_key: str, df: pd.DataFrame) -> None:
+    """Start profiling a dataset version in the background."""
+    if cached_profile(dataset_key) is not None:
+        return
+    future = jobs.submit_once(("profile", dataset_key), get_profile, dataset_key, df)
+    if future.done():
+        # Finished earlier, but the dataset was released since and its profile dropped with it.
+        jobs.forget(("profile", dataset_key))
+        jobs.submit_once(("profile", dataset_key), get_profile, dataset_key, df)
@@ -0,0 +1,102 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SAMPLE_ROWS = 100_000
+DEFAULT_SEED = 42
+
+
+class ReservoirSampler:
+    """Uniform, reproducible sample of a stream of chunks.
+
+    Every row gets a random key from a seeded generator and the ``n`` smallest keys are kept,
+    so samples from separate chunks merge exactly and the result depends only on the seed.
+    """
+
+    def __init__(self, n: int, seed: int = DEFAULT_SEED) -> None:
+        self.n = n
+        self._rng = np.random.default_rng(seed)
+        self._rows: Optional[pd.DataFrame] = None
+        self._keys = np.empty(0)
+        self.seen = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        keys = self._rng.random(len(chunk))
+        self.seen += len(chunk)
+        rows = chunk if self._rows is None else pd.concat([self._rows, chunk])
+        keys = np.concatenate([self._keys, keys])
+        if len(keys) > self.n:
+            keep = np.argpartition(keys, self.n - 1)[: self.n]
+            keep.sort()
+            rows, keys = rows.iloc[keep], keys[keep]
+        self._rows, self._keys = rows, keys
+
+    def sample(self) -> pd.DataFrame:
+        return self._rows if self._rows is not None else pd.DataFrame()
+
+
+def reservoir_sample(df: pd.DataFrame, n: int, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """Uniform sample of ``n`` rows in original order; the whole frame if it is smaller."""
+    if len(df) <= n:
+        return df
+    sampler = ReservoirSampler(n, seed)
+    sampler.update(df)
+    return sampler.sample()
+
+
+def _allocate(total: int, capacity: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    # Largest-remainder split of ``total`` in proportion to ``capacity``; sums to ``total`` exactly.
+    # Ties (e.g. many single-row strata) are broken at random, not by order of appearance.
+    if total <= 0 or capacity.sum() == 0:
+        return np.zeros(len(capacity), dtype=np.int64)
+    exact = capacity * (total / capacity.sum())
+    quotas = np.floor(exact).astype(np.int64)
+    short = total - int(quotas.sum())
+    if short:
+        quotas[np.lexsort((rng.random(len(capacity)), quotas - exact))[:short]] += 1
+    return np.minimum(quotas, capacity)
+
+
+def stratified_sample(df: pd.DataFrame, column: str, n: int, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """Sample exactly ``n`` rows with each value of ``column`` represented in proportion.
+
+    Every value appears at least once when there are no more values than ``n``; with more
+    (e.g. an ID column), the rarest values may be left out so the sample never exceeds ``n``.
+    """
+    if len(df) <= n:
+        return df
+    rng = np.random.default_rng(seed)
+    codes, _ = pd.factorize(df[column], use_na_sentinel=False)
+    sizes = np.bincount(codes)
+    floor = 1 if len(sizes) <= n else 0
+    quotas = floor + _allocate(n - floor * len(sizes), sizes - floor, rng)
+    # Rank rows inside their stratum by a random key; keep the first `quota` of each.
+    order = np.lexsort((rng.random(len(df)), codes))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.empty(len(df), dtype=np.int64)
+    rank[order] = np.arange(len(df)) - np.repeat(starts, sizes)
+    keep = np.flatnonzero(rank < quotas[codes])
+    return df.iloc[keep]
+
+
+def sample_frame(
+    df: pd.DataFrame, method: str, n: int, seed: int = DEFAULT_SEED, column: Optional[str] = None
+) -> pd.DataFrame:
+    if method == "stratified" and column is not None:
+        return stratified_sample(df, column, n, seed)
+    return reservoir_sample(df, n, seed)
+
+
+def sample_key(dataset_key: str, method: str, n: int, seed: int, column: Optional[str] = None) -> str:
+    suffix = f"-{column}" if column is not None else ""
+    return f"{dataset_key}:{method}-{n}-{seed}{suffix}"
+
+
+def badge_html(exact: bool) -> str:
+    """Small pill marking a number as computed on the sample or on the full data."""
+    color, label = ("#22c55e", "exact") if exact else ("#eab308", "sampled")
+    return (
+        f'<span style="display:inline-block;padding:0.05rem 0.5rem;border-radius:999px;'
+        f'font-size:11px;font-weight:600;background:{color};color:#05061a;">{label}</span>'
+    )
@@ -0,0 +1,199 @@
+import csv
+import io
+import re
+import zipfile
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+SAMPLE_BYTES = 64 * 1024
+DELIMITERS = ",;\t|"
+
+_DECIMAL_COMMA = re.compile(r"^-?\d+,\d+$")
+_DECIMAL_POINT = re.compile(r"^-?\d+\.\d+$")
+
+
+@dataclass
+class FormatGuess:
+    """Reader and dialect chosen for an upload before any full parse."""
+
+    reader: str
+    delimiter: str = ","
+    encoding: str = "utf-8"
+    decimal: str = "."
+    header: Optional[int] = 0
+    skiprows: int = 0
+    compression: Optional[str] = None
+
+    def read_csv_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"sep": self.delimiter, "encoding": self.encoding, "header": self.header}
+        if self.decimal != ".":
+            kwargs["decimal"] = self.decimal
+        if self.skiprows:
+            kwargs["skiprows"] = self.skiprows
+        return kwargs
+
+
+def _sniff_binary(data: bytes) -> Optional[str]:
+    head = data[:8]
+    if head.startswith(b"PAR1"):
+        return "parquet"
+    if head.startswith(b"ARROW1"):
+        return "arrow"
+    if head.startswith(b"FEA1"):
+        return "feather"
+    if head.startswith(b"\xff\xff\xff\xff"):
+        return "arrow_stream"
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        return "excel"
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                names = archive.namelist()
+        except zipfile.BadZipFile:
+            return None
+        if any(name.startswith("xl/") for name in names):
+            return "excel"
+    return None
+
+
+def _detect_encoding(sample: bytes) -> str:
+    if sample.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    if sample.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "utf-16"
+    # The sample may end in the middle of a multi-byte character; ignore a short tail.
+    for trim in range(4):
+        try:
+            sample[: len(sample) - trim].decode("utf-8")
+            return "utf-8"
+        except UnicodeDecodeError:
+            continue
+    try:
+        sample.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def _sample_lines(sample: bytes, encoding: str, complete: bool) -> List[str]:
+    text = sample.decode(encoding, errors="ignore")
+    lines = text.splitlines()
+    if not complete and lines:
+        lines = lines[:-1]  # last line is probably cut off
+    return lines
+
+
+def _detect_delimiter(lines: List[str]) -> str:
+    body = [line for line in lines if line.strip()][:200]
+    try:
+        return csv.Sniffer().sniff("\n".join(body), delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        pass
+    # Fall back to the candidate that splits lines most consistently.
+    best, best_score = ",", -1.0
+    for delim in DELIMITERS:
+        counts = [line.count(delim) for line in body]
+        if not counts or max(counts) == 0:
+            continue
+        modal, freq = Counter(counts).most_common(1)[0]
+        score = freq / len(counts) * (modal > 0)
+        if score > best_score:
+            best, best_score = delim, score
+    return best
+
+
+def _split(lines: List[str], delimiter: str) -> List[List[str]]:
+    return list(csv.reader(lines, delimiter=delimiter))
+
+
+def _detect_skiprows(rows: List[List[str]]) -> int:
+    # Only leading title or blank lines (at most one field) are skipped, and only when the table
+    # has several columns; a header row is never skipped for being wider or narrower than the body.
+    widths = [len(row) for row in rows if row]
+    if not widths or max(widths) < 2:
+        return 0
+    for i, row in enumerate(rows):
+        if len([cell for cell in row if cell.strip()]) > 1:
+            return i
+    return 0
+
+
+def _detect_decimal(rows: List[List[str]], delimiter: str) -> str:
+    if delimiter == ",":
+        return "."
+    cells = [cell.strip() for row in rows for cell in row]
+    commas = sum(1 for cell in cells if _DECIMAL_COMMA.match(cell))
+    points = sum(1 for cell in cells if _DECIMAL_POINT.match(cell))
+    return "," if commas > points else "."
+
+
+def _cell_kind(cell: str) -> str:
+    cell = cell.strip()
+    if not cell:
+        return "empty"
+    try:
+        float(cell.replace(",", "."))
+        return "number"
+    except ValueError:
+        return "text"
+
+
+def _has_header(rows: List[List[str]]) -> bool:
+    """True unless the first row looks exactly like the body.
+
+    A header is assumed (as ``read_csv`` does) and only dropped on positive evidence: every
+    column's first cell has the same kind as its body cells, and the same width where the body
+    widths agree, with at least one numeric column. Labels such as ``2019`` over small counts
+    therefore still count as a header, and all-text tables keep theirs.
+    """
+    if len(rows) < 2:
+        return True
+    first, rest = rows[0], rows[1:]
+    any_numeric = False
+    for i, cell in enumerate(first):
+        body = [row[i].strip() for row in rest if i < len(row) and row[i].strip()]
+        kind = _cell_kind(cell)
+        if not body or kind == "empty":
+            continue
+        body_kinds = {_cell_kind(value) for value in body}
+        if body_kinds != {kind}:
+            return True
+        widths = {len(value) for value in body}
+        if len(widths) == 1 and len(cell.strip()) not in widths:
+            return True
+        any_numeric = any_numeric or kind == "number"
+    return not any_numeric
+
+
+def sniff(data: bytes, filename: Optional[str] = None, sample_bytes: int = SAMPLE_BYTES) -> FormatGuess:
+    """Pick the reader and CSV dialect from magic bytes and a small prefix sample.
+
+    Raises ValueError for binary payloads that none of the readers understand.
+    """
+    binary = _sniff_binary(data)
+    if binary is not None:
+        return FormatGuess(reader=binary)
+
+    sample = bytes(data[:sample_bytes])
+    encoding = _detect_encoding(sample)
+    if b"\x00" in sample and encoding != "utf-16":
+        name = f" ({filename})" if filename else ""
+        raise ValueError(f"Unrecognised binary file{name}; expected CSV, Excel, Parquet, Feather or Arrow.")
+
+    lines = _sample_lines(sample, encoding, complete=len(data) <= sample_bytes)
+    if not lines:
+        return FormatGuess(reader="csv", encoding=encoding)
+
+    delimiter = "\t" if filename and filename.lower().endswith(".tsv") else _detect_delimiter(lines)
+    rows = _split(lines, delimiter)
+    skiprows = _detect_skiprows(rows)
+    table = rows[skiprows:]
+    return FormatGuess(
+        reader="csv",
+        delimiter=delimiter,
+        encoding=encoding,
+        decimal=_detect_decimal(table[1:], delimiter),
+        header=0 if _has_header(table) else None,
+        skiprows=skiprows,
+    )
@@ -0,0 +1,29 @@
+from sniff import sniff
+
+
+def test_year_labels_are_kept_as_header():
+    guess = sniff(b"region,2019,2020\nA,1,2\nB,3,4\n", "wide.csv")
+    assert guess.header == 0
+
+
+def test_text_only_table_keeps_header():
+    assert sniff(b"name,city\nann,oslo\nbob,rome\n", "people.csv").header == 0
+
+
+def test_headerless_numeric_table():
+    assert sniff(b"1,2,3\n4,5,6\n7,8,9\n", "raw.csv").header is None
+
+
+def test_header_kept_with_trailing_delimiters():
+    guess = sniff(b"a,b,c\n1,2,3,\n4,5,6,\n", "trailing.csv")
+    assert (guess.skiprows, guess.header) == (0, 0)
+
+
+def test_header_kept_over_ragged_rows():
+    guess = sniff(b"a,b,c\n1,2\n3,4\n", "ragged.csv")
+    assert (guess.skiprows, guess.header) == (0, 0)
+
+
+def test_title_line_is_skipped():
+    guess = sniff(b"Sales report\n\nregion,units\nA,1\nB,2\n", "titled.csv")
+    assert (guess.skiprows, guess.header) == (2, 0)